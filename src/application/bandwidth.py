@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dtime
+from typing import Any, Callable, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class RateWindow:
+    start: dtime
+    end: dtime
+    bytes_per_sec: Optional[int]  # None — без обмежень
+
+    @classmethod
+    def parse(cls, start: str, end: str, kbps: Optional[int]) -> "RateWindow":
+        return cls(
+            start=datetime.strptime(start, "%H:%M").time(),
+            end=datetime.strptime(end, "%H:%M").time(),
+            bytes_per_sec=kbps * 1000 // 8 if kbps else None
+        )
+
+    def contains(self, moment: dtime) -> bool:
+        if self.start <= self.end:
+            return self.start <= moment < self.end
+        # Вікно через північ, напр. 22:00-06:00
+        return moment >= self.start or moment < self.end
+
+
+class BandwidthLimiter:
+    """
+    Token bucket shared by every in-flight upload.
+
+    Callers reserve bytes before sending them and sleep for the returned debt,
+    so reservations are served in arrival order. Uploads that send equal-sized
+    slices therefore share the link fairly. The rate can follow a time-of-day
+    schedule; outside any window ``default_bytes_per_sec`` applies.
+    """
+
+    SLICE_BYTES = 256 * 1024
+
+    def __init__(
+        self,
+        default_bytes_per_sec: Optional[int] = None,
+        schedule: Iterable[RateWindow] = (),
+        burst_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self._default = default_bytes_per_sec
+        self._schedule: tuple[RateWindow, ...] = tuple(schedule)
+        self._burst_seconds = burst_seconds
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self._tokens: float = 0.0
+        self._last: float = clock()
+        self._active_flows: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._default is not None or any(w.bytes_per_sec for w in self._schedule)
+
+    def current_rate(self) -> Optional[int]:
+        moment = self._wall_clock().time()
+        for window in self._schedule:
+            if window.contains(moment):
+                return window.bytes_per_sec
+        return self._default
+
+    def fair_share(self) -> Optional[int]:
+        rate = self.current_rate()
+        if rate is None:
+            return None
+        return rate // max(self._active_flows, 1)
+
+    def reserve(self, nbytes: int) -> float:
+        """Books ``nbytes`` and returns how long the caller must wait before sending them."""
+        with self._lock:
+            rate = self.current_rate()
+            now = self._clock()
+            if rate is None:
+                self._last = now
+                return 0.0
+
+            capacity = rate * self._burst_seconds
+            self._tokens = min(capacity, self._tokens + (now - self._last) * rate)
+            self._last = now
+            self._tokens -= nbytes
+            return max(0.0, -self._tokens / rate)
+
+    def acquire(self, nbytes: int) -> None:
+        delay = self.reserve(nbytes)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, nbytes: int) -> None:
+        delay = self.reserve(nbytes)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def open_flow(self) -> "UploadFlow":
+        return UploadFlow(self)
+
+    def _register(self, delta: int) -> None:
+        with self._lock:
+            self._active_flows += delta
+
+
+class UploadFlow:
+    """One upload's view of the limiter: throttling plus achieved-rate stats."""
+
+    def __init__(self, limiter: BandwidthLimiter) -> None:
+        self._limiter = limiter
+        self._started: float = time.monotonic()
+        self.bytes_sent: int = 0
+
+    def __enter__(self) -> "UploadFlow":
+        self._limiter._register(+1)
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._limiter._register(-1)
+
+    def acquire(self, nbytes: int) -> None:
+        self._limiter.acquire(nbytes)
+        self.bytes_sent += nbytes
+
+    async def acquire_async(self, nbytes: int) -> None:
+        await self._limiter.acquire_async(nbytes)
+        self.bytes_sent += nbytes
+
+    def stats(self) -> dict[str, Any]:
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        return {
+            "rate_bytes_per_sec": int(self.bytes_sent / elapsed),
+            "allowed_bytes_per_sec": self._limiter.fair_share(),
+        }
@@ -14,8 +14,16 @@ class CreateBatchDTO(BaseModel):
 
     preset_rotation: Optional[List[Dict[str, str]]] = None
 
+    # Напр. ["landscape", "short", "thumbnail"]; порожньо — звичайний рендер 1920x1080
+    render_targets: List[str] = Field(default_factory=list)
+
     category_id: str = "10"
 
+    batch_name: Optional[str] = None
+    channel: Optional[str] = None
+    # Вага партії у справедливому плануванні: 3 — утричі більше claim, ніж у партії з 1
+    priority: int = Field(default=1, ge=1, le=100)
+
     class Config:
         frozen = True
 
@@ -0,0 +1,145 @@
+import threading
+import traceback
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+
+
+# (event, job, extra) — той самий формат, що й StatusCallback воркера
+Subscriber = Callable[[Any, Optional[Any], Optional[dict[str, Any]]], None]
+_Item = tuple[Any, Optional[Any], Optional[dict[str, Any]]]
+
+
+class Subscription:
+    """Bounded queue plus a dispatch thread for one subscriber."""
+
+    def __init__(
+        self,
+        bus: "EventBus",
+        callback: Subscriber,
+        max_queue: int,
+        overflow: OverflowPolicy,
+        name: str,
+    ) -> None:
+        self.name: str = name
+        self.dropped: int = 0
+        self._bus = bus
+        self._callback = callback
+        self._max_queue = max_queue
+        self._overflow = overflow
+        self._queue: deque[_Item] = deque()
+        self._cond: threading.Condition = threading.Condition()
+        self._closed: bool = False
+        self._thread = threading.Thread(target=self._dispatch, name=f"event-sub-{name}", daemon=True)
+        self._thread.start()
+
+    def offer(self, item: _Item) -> None:
+        key = self._bus.coalesce_key(item)
+        with self._cond:
+            if self._closed:
+                return
+
+            if self._overflow == OverflowPolicy.COALESCE and key is not None:
+                for i, queued in enumerate(self._queue):
+                    if self._bus.coalesce_key(queued) == key:
+                        self._queue[i] = item
+                        return
+
+            if len(self._queue) >= self._max_queue:
+                self._evict()
+            self._queue.append(item)
+            self._cond.notify()
+
+    def unsubscribe(self) -> None:
+        self._bus.unsubscribe(self)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _evict(self) -> None:
+        self.dropped += 1
+        if self._overflow == OverflowPolicy.COALESCE:
+            # Спершу жертвуємо прогресом, а не подіями зміни стану
+            for i, queued in enumerate(self._queue):
+                if self._bus.coalesce_key(queued) is not None:
+                    del self._queue[i]
+                    return
+        self._queue.popleft()
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                event, job, extra = self._queue.popleft()
+
+            try:
+                self._callback(event, job, extra)
+            except Exception:
+                traceback.print_exc()
+
+
+class EventBus:
+    """
+    In-process pub/sub for worker status events.
+
+    ``publish`` only enqueues into each subscriber's bounded queue, so a slow
+    subscriber never stalls the worker thread. Events listed in
+    ``coalesce_events`` (progress-like) are merged per job for subscribers
+    using ``OverflowPolicy.COALESCE``.
+    """
+
+    def __init__(self, coalesce_events: Iterable[Any] = (), default_max_queue: int = 256) -> None:
+        self._coalesce_events: frozenset = frozenset(coalesce_events)
+        self._default_max_queue: int = default_max_queue
+        self._subscriptions: tuple[Subscription, ...] = ()
+        self._lock: threading.Lock = threading.Lock()
+
+    def subscribe(
+        self,
+        callback: Subscriber,
+        max_queue: Optional[int] = None,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        name: Optional[str] = None,
+    ) -> Subscription:
+        sub = Subscription(
+            self, callback,
+            max_queue=max_queue or self._default_max_queue,
+            overflow=overflow,
+            name=name or getattr(callback, "__qualname__", "subscriber"),
+        )
+        with self._lock:
+            self._subscriptions = self._subscriptions + (sub,)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not sub)
+        sub.close()
+
+    def publish(self, event: Any, job: Optional[Any] = None, extra: Optional[dict[str, Any]] = None) -> None:
+        # Кортеж підписників замінюється цілком, тому читаємо його без блокування
+        for sub in self._subscriptions:
+            sub.offer((event, job, extra))
+
+    def coalesce_key(self, item: _Item) -> Optional[Hashable]:
+        event, job, _ = item
+        if event not in self._coalesce_events:
+            return None
+        return event, getattr(job, "id", None)
+
+    def close(self, timeout: Optional[float] = 2.0) -> None:
+        with self._lock:
+            subs, self._subscriptions = self._subscriptions, ()
+        for sub in subs:
+            sub.close(timeout)
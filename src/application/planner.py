@@ -0,0 +1,269 @@
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Callable, Optional
+
+from src.domain.entities import Batch, JobStatus, RenderTarget, UploadJob
+from src.domain.ports import JobRepositoryPort, RendererPort
+
+# Як і у воркера: оцінка тривалості за розміром, якщо ffprobe не спрацював
+_FALLBACK_AUDIO_BPS = 128_000
+
+
+def _quota_zone() -> tzinfo:
+    # Квота YouTube Data API скидається опівночі за тихоокеанським часом
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo("America/Los_Angeles")
+    except Exception:
+        # Windows без пакета tzdata — без переходу на літній час
+        return timezone(timedelta(hours=-8))
+
+
+@dataclass
+class JobEta:
+    job_id: int
+    title: str
+    batch_id: Optional[int]
+    duration_sec: float
+    render_seconds: float
+    upload_seconds: float
+    output_bytes: int
+    starts_at: datetime
+    finishes_at: datetime
+    waits_for_quota: bool = False
+
+
+@dataclass
+class BatchEta:
+    batch_id: Optional[int]
+    name: str
+    jobs: int = 0
+    duration_sec: float = 0.0
+    output_bytes: int = 0
+    finishes_at: Optional[datetime] = None
+
+
+@dataclass
+class QueuePlan:
+    generated_at: datetime
+    workers: int
+    render_factor: float
+    upload_bytes_per_sec: float
+    quota_remaining: int
+    jobs: list[JobEta] = field(default_factory=list)
+    batches: list[BatchEta] = field(default_factory=list)
+
+    @property
+    def finishes_at(self) -> Optional[datetime]:
+        return max((j.finishes_at for j in self.jobs), default=None)
+
+
+class QueuePlanner:
+    """
+    Predicts when queued jobs and batches will finish.
+
+    Render time is the audio duration (probed at enqueue time) times the
+    render factor observed on recently completed jobs; upload time is the
+    estimated output size over the observed upload rate. Jobs are replayed in
+    the repository's claim order (weighted fair across batches, or FIFO)
+    across ``workers``; once the daily quota is spent, uploads wait for the
+    next quota reset. With an upload horizon, jobs beyond it are replayed as
+    they become eligible: rendered up to the pre-render lookahead in advance,
+    uploaded no earlier than ``upload_horizon_days`` before publish_at.
+    """
+
+    def __init__(
+        self,
+        repo: JobRepositoryPort,
+        renderer: RendererPort,
+        daily_quota: int,
+        upload_quota_cost: int,
+        render_profiles: Optional[dict[str, RenderTarget]] = None,
+        history_size: int = 50,
+        default_render_factor: float = 0.25,
+        default_upload_bytes_per_sec: float = 2_500_000,
+        fair_scheduling: bool = True,
+        upload_horizon_days: Optional[float] = None,
+        prerender_lookahead_days: Optional[float] = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self.repo = repo
+        self.renderer = renderer
+        self.daily_quota = daily_quota
+        self.upload_quota_cost = upload_quota_cost
+        self.render_profiles: dict[str, RenderTarget] = render_profiles or {}
+        self.history_size = history_size
+        self.default_render_factor = default_render_factor
+        self.default_upload_bytes_per_sec = default_upload_bytes_per_sec
+        self.fair_scheduling = fair_scheduling
+        self.upload_horizon_days = upload_horizon_days
+        self.prerender_lookahead_days = prerender_lookahead_days
+        self._clock = clock
+        self._zone = _quota_zone()
+
+    def plan(self, workers: int = 1) -> QueuePlan:
+        now = self._clock()
+        render_factor, upload_rate = self._throughput()
+
+        last_reset = self._last_quota_reset(now)
+        # Витрачена квота по добах (0 — поточна доба), бо аплоади воркерів ідуть не по черзі в часі
+        quota_used: dict[int, int] = {
+            0: self.repo.count_completed_since(last_reset) * self.upload_quota_cost
+        }
+
+        plan = QueuePlan(
+            generated_at=now,
+            workers=workers,
+            render_factor=render_factor,
+            upload_bytes_per_sec=upload_rate,
+            quota_remaining=max(self.daily_quota - quota_used[0], 0)
+        )
+
+        free_at: list[datetime] = [now] * max(workers, 1)
+        known = {b.id: b for b in self.repo.get_batches()}
+        batches: dict[Optional[int], BatchEta] = {}
+
+        for job in self._deferred_last(self._claim_order(self.repo.get_open_jobs(), known), now):
+            duration = self._duration(job)
+            uploads = self._uploads_per_job(job)
+            render_s = 0.0 if job.video_path else duration * render_factor
+            output_bytes = self._output_bytes(job, duration) * uploads
+            upload_s = output_bytes / upload_rate if upload_rate else 0.0
+
+            upload_from = self._upload_from(job)
+            started = heapq.heappop(free_at)
+            if job.status == JobStatus.PENDING and upload_from:
+                started = max(started, self._render_from(job, upload_from))
+            rendered_at = started + timedelta(seconds=render_s)
+            upload_at = max(rendered_at, upload_from or rendered_at)
+
+            waits = False
+            for _ in range(uploads):
+                day = (upload_at - last_reset) // timedelta(days=1)
+                while quota_used.get(day, 0) + self.upload_quota_cost > self.daily_quota:
+                    day += 1
+                    upload_at = max(upload_at, last_reset + timedelta(days=day))
+                    waits = True
+                quota_used[day] = quota_used.get(day, 0) + self.upload_quota_cost
+
+            finished = upload_at + timedelta(seconds=upload_s)
+            # Відрендерена наперед задача звільняє воркера одразу після рендеру, аплоад — пізніше і короткий
+            heapq.heappush(free_at, rendered_at if render_s and upload_from and upload_from > rendered_at else finished)
+
+            plan.jobs.append(JobEta(
+                job_id=job.id,
+                title=job.metadata.title,
+                batch_id=job.batch_id,
+                duration_sec=duration,
+                render_seconds=render_s,
+                upload_seconds=upload_s,
+                output_bytes=output_bytes,
+                starts_at=started,
+                finishes_at=finished,
+                waits_for_quota=waits
+            ))
+
+            summary = batches.get(job.batch_id)
+            if summary is None:
+                name = known[job.batch_id].name if job.batch_id in known else "(no batch)"
+                summary = batches[job.batch_id] = BatchEta(batch_id=job.batch_id, name=name)
+            summary.jobs += 1
+            summary.duration_sec += duration
+            summary.output_bytes += output_bytes
+            summary.finishes_at = max(summary.finishes_at or finished, finished)
+
+        plan.batches = list(batches.values())
+        return plan
+
+    def _throughput(self) -> tuple[float, float]:
+        history = self.repo.get_completed_history(self.history_size)
+
+        rendered = [j for j in history if j.render_seconds and j.media]
+        render_time = sum(j.render_seconds for j in rendered)
+        audio_time = sum(j.media.duration_sec for j in rendered)
+        render_factor = render_time / audio_time if audio_time else self.default_render_factor
+
+        uploaded = [j for j in history if j.upload_seconds and j.upload_bytes]
+        upload_time = sum(j.upload_seconds for j in uploaded)
+        upload_bytes = sum(j.upload_bytes for j in uploaded)
+        upload_rate = upload_bytes / upload_time if upload_time else self.default_upload_bytes_per_sec
+
+        return render_factor, upload_rate
+
+    def _last_quota_reset(self, now: datetime) -> datetime:
+        local_now = now.astimezone()
+        quota_now = local_now.astimezone(self._zone)
+        midnight = quota_now.replace(hour=0, minute=0, second=0, microsecond=0)
+        # Repo зберігає наївний локальний час
+        return midnight.astimezone(local_now.tzinfo).replace(tzinfo=None)
+
+    def _claim_order(self, jobs: list[UploadJob], batches: dict[int, Batch]) -> list[UploadJob]:
+        # Задачі в роботі вже займають воркерів, далі — черга в порядку claim_next
+        def job_key(j: UploadJob):
+            return -j.priority, j.publish_at or datetime.max
+
+        ordered = sorted((j for j in jobs if j.status == JobStatus.PROCESSING), key=job_key)
+        pending = sorted((j for j in jobs if j.status == JobStatus.PENDING), key=job_key)
+        if not self.fair_scheduling:
+            return ordered + pending
+
+        queues: dict[Optional[int], list[UploadJob]] = {}
+        for job in pending:
+            queues.setdefault(job.batch_id if job.batch_id in batches else None, []).append(job)
+        orphans = queues.pop(None, [])
+
+        vtime = {batch_id: batches[batch_id].vtime for batch_id in queues}
+        cursor = dict.fromkeys(queues, 0)
+        while queues:
+            batch_id = min(queues, key=lambda b: (vtime[b], -batches[b].priority, b))
+            ordered.append(queues[batch_id][cursor[batch_id]])
+            cursor[batch_id] += 1
+            vtime[batch_id] += 1.0 / max(batches[batch_id].priority, 1)
+            if cursor[batch_id] == len(queues[batch_id]):
+                del queues[batch_id]
+        return ordered + orphans
+
+    def _upload_from(self, job: UploadJob) -> Optional[datetime]:
+        if self.upload_horizon_days is None or job.publish_at is None:
+            return None
+        return job.publish_at - timedelta(days=self.upload_horizon_days)
+
+    def _render_from(self, job: UploadJob, upload_from: datetime) -> datetime:
+        if job.video_path:
+            return upload_from
+        return upload_from - timedelta(days=self.prerender_lookahead_days or 0)
+
+    def _deferred_last(self, ordered: list[UploadJob], now: datetime) -> list[UploadJob]:
+        # Задачі за горизонтом воркер бере лише тоді, коли вони в нього входять, — у порядку publish_at
+        if self.upload_horizon_days is None:
+            return ordered
+        ready, deferred = [], []
+        for job in ordered:
+            upload_from = self._upload_from(job)
+            if job.status == JobStatus.PENDING and upload_from and upload_from > now:
+                deferred.append(job)
+            else:
+                ready.append(job)
+        return ready + sorted(deferred, key=lambda j: self._render_from(j, self._upload_from(j)))
+
+    def _duration(self, job: UploadJob) -> float:
+        if job.media:
+            return job.media.duration_sec
+        try:
+            return job.audio_path.stat().st_size * 8 / _FALLBACK_AUDIO_BPS
+        except OSError:
+            return 0.0
+
+    def _uploads_per_job(self, job: UploadJob) -> int:
+        if job.video_path:
+            return 1
+        # Дочірні задачі multi-output рендеру з'являться в черзі лише після рендеру
+        videos = [t for t in job.render_targets
+                  if t in self.render_profiles and self.render_profiles[t].kind == "video"]
+        return max(len(videos), 1)
+
+    def _output_bytes(self, job: UploadJob, duration: float) -> int:
+        if job.video_path and job.video_path.exists():
+            return job.video_path.stat().st_size
+        return self.renderer.estimate_output_size(duration)
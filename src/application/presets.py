@@ -1,46 +1,134 @@
 import json
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
 
+from src.domain.ports import PresetStorePort
+
+_PLACEHOLDER = "{filename}"
+
+
 class Preset(BaseModel):
     title_template: str
     desc_template: str
     tags_template: str
 
+
+@dataclass(frozen=True)
+class CompiledPreset:
+    """Templates pre-split on ``{filename}``: rendering a file is a join, not a pass over every tag."""
+
+    title_parts: Tuple[str, ...]
+    desc_parts: Tuple[str, ...]
+    tag_parts: Tuple[Tuple[str, ...], ...]
+
+    def render(self, filename: str) -> Tuple[str, str, List[str]]:
+        title = filename.join(self.title_parts)
+        desc = filename.join(self.desc_parts)
+
+        processed_tags = []
+        for parts in self.tag_parts:
+            t = filename.join(parts)
+            if len(t) > 100:
+                t = t[:100]
+            processed_tags.append(t.replace("<", "").replace(">", ""))
+
+        # YouTube обмежує сумарну довжину тегів 500 символами
+        final_tags = []
+        total_len = 0
+        for tag in processed_tags:
+            if total_len + len(tag) + 1 > 500:
+                break
+            final_tags.append(tag)
+            total_len += len(tag) + 1
+
+        return title, desc, final_tags
+
+
+@lru_cache(maxsize=256)
+def compile_templates(title_template: Optional[str], desc_template: Optional[str],
+                      tags_template: Optional[str]) -> CompiledPreset:
+    # Ключ — сам текст шаблонів, тож кожна версія пресета компілюється один раз
+    raw_tags = [t.strip() for t in tags_template.split(",")] if tags_template else []
+    return CompiledPreset(
+        title_parts=tuple((title_template or "").split(_PLACEHOLDER)),
+        desc_parts=tuple((desc_template or "").split(_PLACEHOLDER)),
+        tag_parts=tuple(tuple(t.split(_PLACEHOLDER)) for t in raw_tags if t)
+    )
+
+
 class PresetManager:
-    def __init__(self, storage_path: Path):
-        self.path = storage_path
+    """
+    Presets backed by a transactional store shared between processes.
+
+    Reads are served from memory; at most every ``refresh_interval`` seconds
+    the store's change counter is checked and presets are reloaded only when
+    another process (or this one) changed them.
+    """
+
+    def __init__(self, store: PresetStorePort, legacy_path: Optional[Path] = None,
+                 refresh_interval: float = 1.0):
+        self.store = store
+        self.refresh_interval = refresh_interval
         self._presets: Dict[str, Preset] = {}
-        self._load()
+        self._version: Optional[int] = None
+        self._checked_at: float = 0.0
+        self._lock = threading.Lock()
 
-    def _load(self):
-        if not self.path.exists():
-            return
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                for name, fields in data.items():
-                    self._presets[name] = Preset(**fields)
-        except Exception as e:
-            print(f"Error loading presets: {e}")
+        if legacy_path:
+            self._import_legacy(legacy_path)
+        self._refresh(force=True)
+
+    @property
+    def version(self) -> int:
+        self._refresh()
+        return self._version or 0
 
     def save_preset(self, name: str, preset: Preset):
-        self._presets[name] = preset
-        self._flush()
+        self.store.save(name, preset.model_dump())
+        self._refresh(force=True)
 
     def delete_preset(self, name: str):
-        if name in self._presets:
-            del self._presets[name]
-            self._flush()
+        self.store.delete(name)
+        self._refresh(force=True)
 
     def get_preset(self, name: str) -> Optional[Preset]:
+        self._refresh()
         return self._presets.get(name)
 
     def get_all_names(self) -> list[str]:
+        self._refresh()
         return list(self._presets.keys())
 
-    def _flush(self):
-        data = {name: p.model_dump() for name, p in self._presets.items()}
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+    def _refresh(self, force: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+
+            if not force and self.store.version() == self._version:
+                return
+
+            version, stored = self.store.load_all()
+            self._presets = {name: Preset(**fields) for name, fields in stored.items()}
+            self._version = version
+
+    def _import_legacy(self, path: Path):
+        if not path.exists():
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = {name: Preset(**fields).model_dump() for name, fields in json.load(f).items()}
+        except Exception as e:
+            print(f"Error loading presets: {e}")
+            return
+
+        if self.store.import_legacy(data):
+            # Файл залишаємо як резервну копію, але під іншим ім'ям — більше його не читаємо
+            path.replace(path.with_name(path.name + ".imported"))
+            print(f"Imported {len(data)} presets from {path.name}")
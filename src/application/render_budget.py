@@ -0,0 +1,83 @@
+import shutil
+import threading
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class BudgetSnapshot:
+    free_bytes: int
+    inflight_bytes: int
+    reserved_bytes: int
+    min_free_bytes: int
+    max_inflight_bytes: int
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class RenderBudget:
+    """
+    Admission control for the render stage.
+
+    In-flight bytes are everything rendered into ``temp_dir`` that has not been
+    uploaded and removed yet, plus the estimated size of renders in progress.
+    Shared by all workers of the process; other processes are accounted for
+    through the files they leave on disk.
+    """
+
+    def __init__(self, temp_dir: Path, min_free_bytes: int, max_inflight_bytes: int) -> None:
+        self.temp_dir: Path = temp_dir
+        self.min_free_bytes: int = min_free_bytes
+        self.max_inflight_bytes: int = max_inflight_bytes
+        self._reservations: dict[Path, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def try_reserve(self, output: Path, estimate_bytes: int) -> tuple[bool, BudgetSnapshot]:
+        with self._lock:
+            snapshot = self._snapshot()
+            # Частину резерву, що вже лежить на диску, free_bytes вже врахував
+            pending_growth = sum(
+                max(est - self._file_size(path), 0) for path, est in self._reservations.items()
+            )
+            fits_disk = snapshot.free_bytes - pending_growth - estimate_bytes >= self.min_free_bytes
+            # Один рендер, більший за весь ліміт, не повинен блокувати чергу назавжди
+            fits_inflight = (
+                snapshot.inflight_bytes + estimate_bytes <= self.max_inflight_bytes
+                or snapshot.inflight_bytes == 0
+            )
+
+            if fits_disk and fits_inflight:
+                self._reservations[output] = estimate_bytes
+                return True, self._snapshot()
+            return False, snapshot
+
+    def release(self, output: Path) -> None:
+        with self._lock:
+            self._reservations.pop(output, None)
+
+    def snapshot(self) -> BudgetSnapshot:
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> BudgetSnapshot:
+        reserved = sum(max(est, self._file_size(path)) for path, est in self._reservations.items())
+        on_disk = sum(
+            self._file_size(path) for path in self.temp_dir.iterdir()
+            if path.is_file() and path not in self._reservations
+        )
+        return BudgetSnapshot(
+            free_bytes=shutil.disk_usage(self.temp_dir).free,
+            inflight_bytes=on_disk + reserved,
+            reserved_bytes=reserved,
+            min_free_bytes=self.min_free_bytes,
+            max_inflight_bytes=self.max_inflight_bytes
+        )
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
@@ -1,14 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional
 
-from src.domain.entities import UploadJob, VideoMetadata
+from src.domain.entities import Batch, MediaInfo, UploadJob, VideoMetadata
+from src.domain.ports import MediaProbePort
 from src.application.dtos import CreateBatchDTO
+from src.application.presets import compile_templates
 
 
 class BatchScheduler:
-    def __init__(self, repo):
+    def __init__(self, repo, prober: Optional[MediaProbePort] = None, probe_workers: int = 4):
         self.repo = repo
+        self.prober = prober
+        self.probe_workers = probe_workers
 
     def create_batch(self, dto: CreateBatchDTO) -> int:
         audio_files = sorted(list(dto.audio_folder.glob("*.mp3")))
@@ -16,6 +21,19 @@ class BatchScheduler:
         if not audio_files:
             raise ValueError(f"No .mp3 files found in {dto.audio_folder}")
 
+        media = self._probe_all(audio_files)
+
+        rotation = dto.preset_rotation or [
+            {"title": dto.title_template or "", "desc": dto.desc_template or "", "tags": dto.tags_template or ""}
+        ]
+        batch_id = self.repo.add_batch(Batch(
+            name=dto.batch_name or dto.audio_folder.name,
+            preset_rotation=rotation,
+            upload_interval=dto.upload_interval,
+            channel=dto.channel,
+            priority=dto.priority
+        ))
+
         current_date = dto.start_date.replace(hour=12, minute=30, second=0)
 
         count = 0
@@ -30,9 +48,7 @@ class BatchScheduler:
 
             cover_image = self._resolve_cover_image(audio_path, dto.fallback_image)
 
-            title, desc, tags = self._generate_metadata(
-                audio_path.stem, t_tmpl, d_tmpl, tags_tmpl
-            )
+            title, desc, tags = compile_templates(t_tmpl, d_tmpl, tags_tmpl).render(audio_path.stem)
 
             job = UploadJob(
                 audio_path=audio_path,
@@ -43,7 +59,11 @@ class BatchScheduler:
                     tags=tags,
                     category_id=dto.category_id
                 ),
-                publish_at=current_date
+                publish_at=current_date,
+                render_targets=list(dto.render_targets),
+                media=media[i],
+                batch_id=batch_id,
+                priority=dto.priority
             )
 
             self.repo.add(job)
@@ -53,49 +73,23 @@ class BatchScheduler:
 
         return count
 
+    def _probe_all(self, audio_files: List[Path]) -> List[Optional[MediaInfo]]:
+        if not self.prober:
+            return [None] * len(audio_files)
+
+        def probe(path: Path) -> Optional[MediaInfo]:
+            # Файл без тривалості (чи відсутній ffprobe) не блокує партію — воркер оцінить його за розміром
+            try:
+                return self.prober.probe(path)
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(self.probe_workers, 1)) as pool:
+            return list(pool.map(probe, audio_files))
+
     def _resolve_cover_image(self, audio_path: Path, fallback: Path) -> Path:
         for ext in [".jpg", ".png", ".jpeg"]:
             potential_cover = audio_path.with_suffix(ext)
             if potential_cover.exists():
                 return potential_cover
-        return fallback
-
-    def _generate_metadata(self, filename: str, t_tmpl: str, d_tmpl: str, tags_tmpl: str) -> Tuple[str, str, List[str]]:
-        context = {
-            "{filename}": filename
-        }
-
-        title = t_tmpl
-        desc = d_tmpl or ""
-
-        for key, val in context.items():
-            title = title.replace(key, val)
-            desc = desc.replace(key, val)
-
-        # Обробка тегів
-        raw_tags = tags_tmpl.split(",") if tags_tmpl else []
-        processed_tags = []
-
-        for t in raw_tags:
-            t = t.strip()
-            if not t: continue
-
-            for key, val in context.items():
-                t = t.replace(key, val)
-
-            if len(t) > 100:
-                t = t[:100]
-
-            t = t.replace("<", "").replace(">", "")
-
-            processed_tags.append(t)
-
-        final_tags = []
-        total_len = 0
-        for tag in processed_tags:
-            if total_len + len(tag) + 1 > 500:
-                break
-            final_tags.append(tag)
-            total_len += len(tag) + 1
-
-        return title, desc, final_tags
\ No newline at end of file
+        return fallback
\ No newline at end of file
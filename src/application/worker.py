@@ -1,12 +1,23 @@
+import os
+import shutil
+import socket
 import time
 import traceback
 import threading
+import uuid
+from dataclasses import replace
+from datetime import datetime, timedelta
 from enum import Enum, auto
 from pathlib import Path
 from typing import Any, Callable, Optional
 
-from src.domain.ports import JobRepositoryPort, RendererPort, UploaderPort
-from src.domain.entities import UploadJob
+from src.application.render_budget import RenderBudget
+from src.domain.ports import JobRepositoryPort, MediaProbePort, ProgressCallback, RendererPort, UploaderPort
+from src.domain.entities import JobStatus, RenderTarget, UploadJob
+
+# Якщо ffprobe недоступний, тривалість оцінюється з розміру MP3
+_FALLBACK_AUDIO_BPS = 128_000
+_MB = 1024 * 1024
 
 
 class JobEvent(Enum):
@@ -18,6 +29,9 @@ class JobEvent(Enum):
     JOB_COMPLETED = auto()
     JOB_FAILED = auto()
     QUOTA_EXCEEDED = auto()
+    RENDER_BUDGET = auto()
+    JOB_PROGRESS = auto()
+    JOB_PRERENDERED = auto()
 
 
 # Callback type aliases
@@ -33,6 +47,51 @@ def _noop_status(event: JobEvent, job: Optional[UploadJob] = None, extra: Option
     pass
 
 
+def _default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaseLostError(Exception):
+    """The job's lease expired and may already belong to another worker."""
+
+    def __init__(self, message: str, result: Any = None) -> None:
+        super().__init__(message)
+        # Результат етапу, що встиг завершитися до виявлення втрати оренди
+        self.result: Any = result
+
+
+class _LeaseKeeper:
+    """Renews the job lease in the background while a long stage is running."""
+
+    def __init__(self, worker: "QueueWorker", job: UploadJob) -> None:
+        self._worker = worker
+        self._job = job
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.lost: bool = False
+
+    def __enter__(self) -> "_LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._done.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._done.wait(self._worker.heartbeat_interval):
+            try:
+                renewed = self._worker.repo.heartbeat(
+                    self._job.id, self._worker.worker_id, self._worker.lease_seconds
+                )
+            except Exception as e:
+                self._worker.log(f"   - Heartbeat failed: {e}")
+                continue
+            if not renewed:
+                self.lost = True
+                return
+
+
 class QueueWorker:
     def __init__(
         self,
@@ -42,6 +101,17 @@ class QueueWorker:
         temp_dir: Path,
         logger_callback: Optional[LogCallback] = None,
         status_callback: Optional[StatusCallback] = None,
+        worker_id: Optional[str] = None,
+        lease_seconds: int = 300,
+        heartbeat_interval: float = 60,
+        reaper_interval: float = 120,
+        max_lease_reclaims: int = 3,
+        prober: Optional[MediaProbePort] = None,
+        render_budget: Optional[RenderBudget] = None,
+        budget_poll_interval: float = 15,
+        render_profiles: Optional[dict[str, RenderTarget]] = None,
+        upload_horizon_days: Optional[float] = None,
+        prerender_lookahead_days: Optional[float] = None,
     ) -> None:
         self.repo: JobRepositoryPort = repo
         self.renderer: RendererPort = renderer
@@ -49,88 +119,429 @@ class QueueWorker:
         self.temp_dir: Path = temp_dir
         self.log: LogCallback = logger_callback or _noop_log
         self.on_status: StatusCallback = status_callback or _noop_status
+        self.worker_id: str = worker_id or _default_worker_id()
+        self.lease_seconds: int = lease_seconds
+        self.heartbeat_interval: float = heartbeat_interval
+        self.reaper_interval: float = reaper_interval
+        self.max_lease_reclaims: int = max_lease_reclaims
+        self.prober: Optional[MediaProbePort] = prober
+        self.render_budget: Optional[RenderBudget] = render_budget
+        self.budget_poll_interval: float = budget_poll_interval
+        self.render_profiles: dict[str, RenderTarget] = render_profiles or {}
+        self.upload_horizon_days: Optional[float] = upload_horizon_days
+        self.prerender_lookahead_days: Optional[float] = prerender_lookahead_days
+        # Мітка в іменах тимчасових файлів: новий власник задачі не пише у файли воркера,
+        # у якого оренду забрали, поки той, можливо, ще рендерить
+        self._file_tag: str = uuid.uuid4().hex[:8]
+        self._render_paused_until: float = 0.0
         self._stop_event: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
 
     def start_background(self) -> None:
-        t = threading.Thread(target=self._run_loop, daemon=True)
-        t.start()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
 
     def stop(self) -> None:
         self._stop_event.set()
 
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
+
     def is_running(self) -> bool:
         return not self._stop_event.is_set()
 
     def _emit(self, event: JobEvent, job: Optional[UploadJob] = None, **extra: Any) -> None:
         self.on_status(event, job, extra if extra else None)
 
+    def _progress_reporter(self, job: UploadJob) -> ProgressCallback:
+        def report(fraction: float, stats: dict[str, Any]) -> None:
+            self._emit(JobEvent.JOB_PROGRESS, job, stage="upload", progress=fraction, **stats)
+        return report
+
+    def _reap_expired_leases(self) -> None:
+        try:
+            reclaimed = self.repo.release_expired_leases(self.max_lease_reclaims)
+        except Exception as e:
+            self.log(f"Lease reaper failed: {e}")
+            return
+
+        for stale in reclaimed:
+            self.log(f"Recovered Job #{stale.id} from expired lease (worker: {stale.worker_id or 'unknown'})")
+            # Відео дочірньої задачі — це її вхід, а не тимчасовий файл
+            if not stale.video_path:
+                self._remove_temp_files(stale.id)
+
+    def _remove_temp_files(self, job_id: int) -> None:
+        # Прострочена оренда не означає, що воркер мертвий: файли, які ще змінюються, не чіпаємо
+        stale_before = time.time() - self.lease_seconds
+        try:
+            # Додаткові відео, з яких уже створено дочірні задачі, — їхній вхід, а не залишки рендеру
+            queued = {child.video_path.name for child in self.repo.get_children(job_id) if child.video_path}
+        except Exception as e:
+            self.log(f"Failed to clean temp files of Job #{job_id}: {e}")
+            return
+        for leftover in self.temp_dir.glob(f"render_{job_id}.*"):
+            try:
+                if leftover.name in queued or self._last_modified(leftover) > stale_before:
+                    continue
+                if leftover.is_dir():
+                    shutil.rmtree(leftover)
+                else:
+                    leftover.unlink()
+            except Exception as clean_err:
+                self.log(f"Failed to clean temp file: {clean_err}")
+
+    def _unlink(self, *paths: Optional[Path]) -> None:
+        for path in paths:
+            if path and path.exists():
+                try:
+                    path.unlink()
+                except Exception as clean_err:
+                    self.log(f"Failed to clean temp file: {clean_err}")
+
+    @staticmethod
+    def _last_modified(path: Path) -> float:
+        if not path.is_dir():
+            return path.stat().st_mtime
+        return max((p.stat().st_mtime for p in path.rglob("*")), default=path.stat().st_mtime)
+
+    def _claim_job(self) -> tuple[Optional[UploadJob], bool]:
+        """
+        Claims the next job whose publish_at is within the upload horizon; if there is
+        none, a job from the pre-render window beyond it. Returns (job, prerender_only).
+        While renders are paused by the budget, only already rendered jobs are claimed.
+        """
+        paused = time.monotonic() < self._render_paused_until
+        if self.upload_horizon_days is None:
+            return self.repo.claim_next(self.worker_id, self.lease_seconds, rendered_only=paused), False
+
+        horizon = datetime.now() + timedelta(days=self.upload_horizon_days)
+        job = self.repo.claim_next(self.worker_id, self.lease_seconds, publish_before=horizon, rendered_only=paused)
+        if job or not self.prerender_lookahead_days or paused:
+            return job, False
+
+        job = self.repo.claim_prerender(
+            self.worker_id, self.lease_seconds,
+            publish_after=horizon,
+            publish_before=horizon + timedelta(days=self.prerender_lookahead_days)
+        )
+        return job, job is not None
+
+    def _park_prerendered(self, job: UploadJob, output_file: Path, thumbnail: Optional[Path]) -> None:
+        # Готове відео чекає в черзі як задача з video_path — аплоад піде тим самим шляхом, що й дочірні
+        video = output_file.with_name(f"prerendered_{job.id}.mp4")
+        output_file.replace(video)
+        if thumbnail and thumbnail.exists():
+            thumbnail.replace(thumbnail.with_name(thumbnail.name.replace("render_", "prerendered_", 1)))
+
+        job.video_path = video
+        job.mark_pending()
+        self._save(job)
+
+    def _prerendered_thumbnail(self, job: UploadJob) -> Optional[Path]:
+        return next(self.temp_dir.glob(f"prerendered_{job.id}.*.jpg"), None)
+
+    def _save(self, job: UploadJob) -> bool:
+        if self.repo.update(job, owner=self.worker_id):
+            return True
+        self.log(f"   - Job #{job.id} is no longer leased by this worker, state not saved")
+        return False
+
+    def _fail(self, job: UploadJob, error: str, rendered: bool) -> None:
+        # Готове відео задачі (дочірнє чи відрендерене наперед) — єдина копія рендеру: після збою аплоаду
+        # повертаємо задачу в чергу, але не більше max_lease_reclaims разів, щоб файл не лежав вічно
+        keeps_video = bool(job.video_path) and not rendered
+        if keeps_video and job.retry_count < self.max_lease_reclaims:
+            job.retry_count += 1
+            job.error_message = error
+            job.mark_pending()
+            self.log(f"   - Job #{job.id} returned to queue with its video "
+                     f"(attempt {job.retry_count} of {self.max_lease_reclaims})")
+            self._save(job)
+            return
+
+        job.mark_failed(error)
+        if self._save(job) and keeps_video:
+            self._unlink(job.video_path, self._prerendered_thumbnail(job))
+
+    def _run_stage(self, job: UploadJob, stage: Callable[[], Any]) -> Any:
+        with _LeaseKeeper(self, job) as lease:
+            result = stage()
+        if lease.lost:
+            raise LeaseLostError(f"Lease for Job #{job.id} expired", result)
+        return result
+
+    def _keep_remote_video(self, job: UploadJob, video_id: str) -> None:
+        # Успішний videos.insert не можна втратити: повторний аплоад — дубль на каналі і ще 1600 одиниць квоти
+        try:
+            if self.repo.save_remote_video(job.id, self.worker_id, video_id):
+                self.log(f"   - Video {video_id} recorded as completed despite the lost lease")
+            else:
+                self.log(f"   - Video {video_id} recorded; the job's new owner will not upload it again")
+        except Exception as e:
+            self.log(f"   - FAILED to record uploaded video {video_id} for Job #{job.id}: {e}")
+
+    def _estimate_render_bytes(self, job: UploadJob) -> int:
+        duration: Optional[float] = job.media.duration_sec if job.media else None
+        if duration is None and self.prober:
+            try:
+                duration = self.prober.probe(job.audio_path).duration_sec
+            except Exception as e:
+                self.log(f"   - Probe failed, estimating from file size: {e}")
+        if duration is None:
+            duration = job.audio_path.stat().st_size * 8 / _FALLBACK_AUDIO_BPS
+        video_outputs = sum(1 for t in self._resolve_targets(job) if t.kind == "video")
+        return self.renderer.estimate_output_size(duration) * max(video_outputs, 1)
+
+    def _resolve_targets(self, job: UploadJob) -> list[RenderTarget]:
+        try:
+            return [self.render_profiles[name] for name in job.render_targets]
+        except KeyError as e:
+            raise ValueError(f"Unknown render profile: {e.args[0]}")
+
+    def _render_multi(self, job: UploadJob, primary_output: Path) -> Optional[Path]:
+        """
+        Renders every target of the job in one FFmpeg pass. The first video target
+        is uploaded by this job; other videos become child jobs that skip rendering.
+        Returns the thumbnail path, if one was requested.
+        """
+        targets = self._resolve_targets(job)
+        videos = [t for t in targets if t.kind == "video"]
+        if not videos:
+            raise ValueError(f"Job #{job.id} has no video render target")
+
+        # Після відновлення з простроченої оренди не дублюємо вже створені дочірні задачі
+        already_queued = {name for child in self.repo.get_children(job.id) for name in child.render_targets}
+
+        outputs: list[tuple[RenderTarget, Path]] = [(videos[0], primary_output)]
+        secondary: list[tuple[RenderTarget, Path]] = []
+        for target in videos[1:]:
+            if target.name in already_queued:
+                continue
+            path = self.temp_dir / f"render_{job.id}.{self._file_tag}.{target.name}.mp4"
+            outputs.append((target, path))
+            secondary.append((target, path))
+
+        thumbnail: Optional[Path] = None
+        for target in targets:
+            if target.kind == "image" and thumbnail is None:
+                thumbnail = self.temp_dir / f"render_{job.id}.{self._file_tag}.{target.name}.jpg"
+                outputs.append((target, thumbnail))
+
+        try:
+            self.renderer.render_multi(job.audio_path, job.image_path, outputs)
+        except Exception:
+            # Основний вихід прибере _run_loop, а шляхи решти виходів відомі лише тут
+            self._unlink(*(path for _, path in outputs[1:]))
+            raise
+
+        for target, path in secondary:
+            child_id = self.repo.add(self._derive_child(job, target, path))
+            self.log(f"   - {target.name} output queued as Job #{child_id}")
+
+        return thumbnail
+
+    def _derive_child(self, job: UploadJob, target: RenderTarget, video_path: Path) -> UploadJob:
+        title = job.metadata.title
+        if target.is_vertical and "#shorts" not in title.lower() and len(title) <= 92:
+            title = f"{title} #Shorts"
+
+        return replace(
+            job,
+            id=None,
+            metadata=replace(job.metadata, title=title),
+            status=JobStatus.PENDING,
+            remote_video_id=None,
+            error_message=None,
+            retry_count=0,
+            worker_id=None,
+            lease_expires_at=None,
+            render_seconds=None,
+            upload_seconds=None,
+            upload_bytes=None,
+            completed_at=None,
+            render_targets=[target.name],
+            parent_id=job.id,
+            video_path=video_path
+        )
+
+    def _set_thumbnail(self, job: UploadJob, video_id: str, thumbnail: Path) -> None:
+        self.log("   - Setting thumbnail...")
+        try:
+            self._run_stage(job, lambda: self.uploader.set_thumbnail(video_id, thumbnail))
+        except LeaseLostError:
+            raise
+        except Exception as e:
+            # Відео вже завантажене — відсутня мініатюра не робить задачу невдалою
+            self.log(f"   - Thumbnail not set: {e}")
+
+    def _admit_render(self, job: UploadJob, output_file: Path) -> bool:
+        """Reserves render budget for the job's output; False if there is no room now."""
+        if not self.render_budget:
+            return True
+
+        estimate: int = self._estimate_render_bytes(job)
+        admitted, snapshot = self.render_budget.try_reserve(output_file, estimate)
+        self._emit(JobEvent.RENDER_BUDGET, job, paused=not admitted, estimate_bytes=estimate, **snapshot.as_dict())
+        if not admitted:
+            self.log(
+                f"   - Render paused: needs ~{estimate // _MB} MB, "
+                f"{snapshot.free_bytes // _MB} MB free, {snapshot.inflight_bytes // _MB} MB in flight"
+            )
+        elif self._render_paused_until:
+            self._render_paused_until = 0.0
+            self.log("   - Render budget available, resuming.")
+        return admitted
+
     def _run_loop(self) -> None:
-        self.log("Worker started. Waiting for jobs...")
+        self.log(f"Worker {self.worker_id} started. Waiting for jobs...")
         self._emit(JobEvent.WORKER_STARTED)
 
+        self._reap_expired_leases()
+        next_reap: float = time.monotonic() + self.reaper_interval
+
         while not self._stop_event.is_set():
             job: Optional[UploadJob] = None
             output_file: Optional[Path] = None
+            thumbnail: Optional[Path] = None
+            prerender: bool = False
+            rendered: bool = False
+            video_id: Optional[str] = None
+
+            if time.monotonic() >= next_reap:
+                self._reap_expired_leases()
+                next_reap = time.monotonic() + self.reaper_interval
 
             try:
-                job = self.repo.get_next_pending()
+                job, prerender = self._claim_job()
                 if not job:
                     time.sleep(2)
                     continue
 
-                self.log(f"Processing Job #{job.id}: {job.audio_path.name}")
+                self.log(f"{'Pre-rendering' if prerender else 'Processing'} Job #{job.id}: {job.audio_path.name}")
                 self._emit(JobEvent.JOB_STARTED, job)
 
-                job.mark_processing()
-                self.repo.update(job)
+                if job.remote_video_id:
+                    # Попередній власник завантажив відео, але втратив оренду до завершення задачі
+                    self.log(f"   - Already uploaded as {job.remote_video_id}, completing without upload")
+                    job.mark_completed(job.remote_video_id)
+                    if self._save(job) and job.video_path:
+                        self._unlink(job.video_path, self._prerendered_thumbnail(job))
+                    self._emit(JobEvent.JOB_COMPLETED, job, video_id=job.remote_video_id)
+                    continue
+
+                if job.video_path and not job.video_path.exists():
+                    # Готовий файл зник (прибрали output/, задачу перезапустили) — рендеримо заново
+                    self.log(f"   - {job.video_path.name} is missing, rendering again")
+                    job.video_path = None
 
-                output_file = self.temp_dir / f"render_{job.id}.mp4"
+                if job.video_path:
+                    output_file = job.video_path
+                    thumbnail = self._prerendered_thumbnail(job)
+                    self.log(f"   - Using pre-rendered {job.video_path.name}")
+                else:
+                    output_file = self.temp_dir / f"render_{job.id}.{self._file_tag}.mp4"
+                    rendered = True
 
-                self.log("   - Rendering video (FFmpeg)...")
-                self._emit(JobEvent.JOB_RENDERING, job)
-                self.renderer.render(job.audio_path, job.image_path, output_file)
+                    # Не чекаємо на бюджет, тримаючи задачу: бюджет звільняють аплоади вже готових відео
+                    # (дочірніх, відрендерених наперед), тож поки пауза — беремо лише їх
+                    if not self._admit_render(job, output_file):
+                        self._render_paused_until = time.monotonic() + self.budget_poll_interval
+                        self.log(f"   - Job #{job.id} returned to queue until the render budget frees up.")
+                        job.mark_pending()
+                        self._save(job)
+                        continue
+
+                    self.log("   - Rendering video (FFmpeg)...")
+                    self._emit(JobEvent.JOB_RENDERING, job)
+                    stage_started = time.monotonic()
+                    if job.render_targets:
+                        thumbnail = self._run_stage(job, lambda: self._render_multi(job, output_file))
+                    else:
+                        duration = job.media.duration_sec if job.media else None
+                        self._run_stage(job, lambda: self.renderer.render(
+                            job.audio_path, job.image_path, output_file, duration_sec=duration))
+                    job.render_seconds = time.monotonic() - stage_started
+
+                if prerender:
+                    if self.render_budget:
+                        self.render_budget.release(output_file)
+                    self._park_prerendered(job, output_file, thumbnail)
+                    output_file = thumbnail = None
+                    self.log(f"   - Pre-rendered, upload deferred until {self.upload_horizon_days:g} days "
+                             f"before {job.publish_at}")
+                    self._emit(JobEvent.JOB_PRERENDERED, job)
+                    continue
 
                 self.log(f"   - Uploading to YouTube (Scheduled: {job.publish_at})...")
                 self._emit(JobEvent.JOB_UPLOADING, job)
 
-                video_id: str = self.uploader.upload(output_file, job)
+                stage_started = time.monotonic()
+                try:
+                    video_id = self._run_stage(
+                        job, lambda: self.uploader.upload(output_file, job, on_progress=self._progress_reporter(job))
+                    )
+                except LeaseLostError as e:
+                    video_id = e.result
+                    raise
+                job.upload_seconds = time.monotonic() - stage_started
+                job.upload_bytes = output_file.stat().st_size
+
+                if thumbnail:
+                    self._set_thumbnail(job, video_id, thumbnail)
 
                 job.mark_completed(video_id)
-                self.repo.update(job)
+                if not self._save(job):
+                    self._keep_remote_video(job, video_id)
+                if not rendered:
+                    # Вхідне відео (дочірнє чи відрендерене наперед) потрібне лише до успішного аплоаду
+                    self._unlink(output_file, thumbnail)
                 self.log(f"   - DONE! Video ID: {video_id}")
                 self._emit(JobEvent.JOB_COMPLETED, job, video_id=video_id)
 
+            except LeaseLostError as e:
+                # Задачу вже міг забрати інший воркер — не чіпаємо її статус, але не втрачаємо завантажене відео
+                self.log(f"   - {e}. Abandoning job.")
+                if video_id:
+                    self._keep_remote_video(job, video_id)
+                # Резерв бюджету і власні (з міткою) файли рендеру прибирає finally — новий власник їх не використає
+                self._emit(JobEvent.JOB_FAILED, job, error=str(e))
+
             except RuntimeError as e:
                 if str(e) == "YOUTUBE_QUOTA_EXCEEDED":
                     self.log("CRITICAL: YouTube Daily Quota Exceeded! Stopping worker.")
                     if job:
-                        job.mark_failed("Quota Exceeded - Worker Stopped")
-                        self.repo.update(job)
+                        self._fail(job, "Quota Exceeded - Worker Stopped", rendered)
                     self._emit(JobEvent.QUOTA_EXCEEDED, job)
                     self._stop_event.set()
                     break
 
                 self.log(f"   - RUNTIME ERROR: {e}")
                 if job:
-                    job.mark_failed(str(e))
-                    self.repo.update(job)
+                    self._fail(job, str(e), rendered)
                     self._emit(JobEvent.JOB_FAILED, job, error=str(e))
 
             except Exception as e:
                 self.log(f"   - UNEXPECTED ERROR: {e}")
                 self.log(traceback.format_exc())
                 if job:
-                    job.mark_failed(str(e))
-                    self.repo.update(job)
+                    self._fail(job, str(e), rendered)
                     self._emit(JobEvent.JOB_FAILED, job, error=str(e))
                 time.sleep(5)
 
             finally:
-                if output_file and output_file.exists():
-                    try:
-                        output_file.unlink()
-                    except Exception as clean_err:
-                        self.log(f"Failed to clean temp file: {clean_err}")
+                if self.render_budget and output_file:
+                    self.render_budget.release(output_file)
+                # Видаляємо лише те, що відрендерено в цій ітерації: video_path задачі — її вхід для повтору
+                if rendered:
+                    self._unlink(output_file, thumbnail)
 
         self.log("Worker stopped.")
         self._emit(JobEvent.WORKER_STOPPED)
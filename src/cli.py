@@ -0,0 +1,162 @@
+"""
+Headless entry point (no GUI imports):
+
+    python -m src.cli enqueue <folder> --cover cover.jpg --start-date 2026-01-01 --preset Default
+    python -m src.cli run --workers 2
+    python -m src.cli status --workers 2
+"""
+import argparse
+import signal
+import sys
+import time
+from datetime import datetime
+
+from src.domain.entities import JobStatus
+from src.infrastructure.ioc_container import Container
+from src.presentation.controllers import BatchController
+
+
+def _cmd_enqueue(container: Container, args: argparse.Namespace) -> int:
+    controller = BatchController(container)
+
+    rotation = []
+    for name in args.preset:
+        preset = controller.load_preset(name)
+        if not preset:
+            print(f"Unknown preset: {name}. Available: {', '.join(controller.get_preset_names()) or '-'}")
+            return 2
+        rotation.append({
+            'title': preset.title_template,
+            'desc': preset.desc_template,
+            'tags': preset.tags_template
+        })
+
+    form_data = {
+        'folder': args.folder,
+        'cover': args.cover,
+        'start_date': args.start_date,
+        'interval': args.interval,
+        'title': rotation[0]['title'],
+        'desc': rotation[0]['desc'],
+        'tags': rotation[0]['tags'],
+        'preset_rotation': rotation if len(rotation) > 1 else None,
+        'render_targets': [t.strip() for t in args.outputs.split(",") if t.strip()] if args.outputs else [],
+        'batch_name': args.name,
+        'channel': args.channel,
+        'priority': args.priority
+    }
+
+    count = controller.generate_batch(form_data)
+    print(f"Queue generated: {count} videos.")
+    return 0
+
+
+def _cmd_run(container: Container, args: argparse.Namespace) -> int:
+    workers = [
+        container.create_worker(log_prefix=f"[w{i}] " if args.workers > 1 else "")
+        for i in range(args.workers)
+    ]
+
+    stopping = False
+
+    def _shutdown(signum, frame):
+        nonlocal stopping
+        if stopping:
+            # Друге повідомлення — виходимо одразу, оренди підбере reaper
+            print("Forced exit.")
+            sys.exit(1)
+        stopping = True
+        print("Shutting down: finishing current jobs (send again to force)...")
+        for w in workers:
+            w.stop()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    for w in workers:
+        w.start_background()
+
+    while any(w.is_alive() for w in workers):
+        _print_logs(container)
+        time.sleep(0.5)
+    return 0
+
+
+def _cmd_status(container: Container, args: argparse.Namespace) -> int:
+    counts = container.repo.get_status_counts()
+    total = sum(counts.values())
+    for status in JobStatus:
+        print(f"{status.value:<12}{counts.get(status, 0):>8}")
+    print(f"{'total':<12}{total:>8}")
+
+    controller = BatchController(container)
+    progress = [p for p in controller.get_batch_progress() if p.done < p.total]
+    if progress:
+        print("\nActive batches:")
+        for p in progress:
+            print(f"  #{p.batch.id} {p.batch.name} (priority {p.batch.priority}): {p.done}/{p.total} done, "
+                  f"{p.counts.get(JobStatus.FAILED, 0)} failed")
+
+    plan = controller.get_queue_plan(workers=args.workers)
+    if plan.jobs:
+        print(f"\nETA with {plan.workers} worker(s), quota left today: {plan.quota_remaining}")
+        for batch in plan.batches:
+            print(f"  {batch.name}: {batch.jobs} jobs, "
+                  f"{batch.duration_sec / 3600:.1f} h audio, done by {batch.finishes_at:%Y-%m-%d %H:%M}")
+        print(f"  queue done by {plan.finishes_at:%Y-%m-%d %H:%M}")
+    return 0
+
+
+def _print_logs(container: Container) -> None:
+    lines, dropped = container.log_sink.drain()
+    if dropped:
+        print(f"... {dropped} lines skipped")
+    for line in lines:
+        print(line, flush=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="yt_automator", description="YT Automator headless mode")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enqueue = sub.add_parser("enqueue", help="Create upload jobs from a folder of MP3 files")
+    p_enqueue.add_argument("folder")
+    p_enqueue.add_argument("--cover", required=True, help="Fallback cover image")
+    p_enqueue.add_argument("--start-date", default=datetime.now().strftime("%Y-%m-%d"), help="YYYY-MM-DD")
+    p_enqueue.add_argument("--interval", type=int, default=1, help="Days between publications")
+    p_enqueue.add_argument("--preset", action="append", required=True,
+                           help="Preset name; repeat to rotate presets across files")
+    p_enqueue.add_argument("--outputs", help="Render profiles in one pass, e.g. landscape,short,thumbnail")
+    p_enqueue.add_argument("--name", help="Batch name (defaults to the folder name)")
+    p_enqueue.add_argument("--channel", help="Channel label recorded on the batch")
+    p_enqueue.add_argument("--priority", type=int, default=1,
+                           help="Batch weight for fair scheduling (1-100); 3 gets 3x the share of 1")
+    p_enqueue.set_defaults(handler=_cmd_enqueue)
+
+    p_run = sub.add_parser("run", help="Process the queue until SIGTERM/SIGINT")
+    p_run.add_argument("--workers", type=int, default=1)
+    p_run.set_defaults(handler=_cmd_run)
+
+    p_status = sub.add_parser("status", help="Print job counts by status and queue ETA")
+    p_status.add_argument("--workers", type=int, default=1, help="Workers assumed for the ETA")
+    p_status.set_defaults(handler=_cmd_status)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    container = Container()
+    try:
+        return args.handler(container, args)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 2
+    finally:
+        # Для будь-якої команди: зупиняємо шину подій і дописуємо логи, що лишилися в буфері
+        container.close()
+        _print_logs(container)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,5 +7,78 @@ VIDEO_WIDTH = 1920
 VIDEO_HEIGHT = 1080
 FFMPEG_PRESET = "ultrafast"
 
+# Профілі multi-output рендеру: назва -> (ширина, висота, тип)
+RENDER_PROFILES = {
+    "landscape": (1920, 1080, "video"),
+    "short": (1080, 1920, "video"),
+    "thumbnail": (1280, 720, "image"),
+}
+
+# Сегментований паралельний рендер довгих міксів (None — вимкнено)
+RENDER_SEGMENT_MIN_MINUTES = 45
+RENDER_SEGMENTS = 4
+
 # Налаштування YouTube
-YOUTUBE_CATEGORY_ID = "10"
\ No newline at end of file
+YOUTUBE_CATEGORY_ID = "10"
+# "sync" — googleapiclient, по одному сервісу на воркер; "async" — спільний asyncio-аплоадер (aiohttp)
+UPLOADER_BACKEND = "sync"
+UPLOAD_CONCURRENCY = 4
+# Локальна заглушка API для навантажувальних тестів (python -m src.tools.fake_youtube), напр. "http://127.0.0.1:8765".
+# Якщо задано — запити без OAuth і реальна квота не витрачається
+YOUTUBE_API_BASE_URL = None
+# Спільний ліміт швидкості аплоаду (kbit/s); None — без обмежень
+UPLOAD_BANDWIDTH_KBPS = None
+# Розклад за часом доби: (початок, кінець, kbit/s або None), напр. [("08:00", "23:00", 20000)]
+UPLOAD_BANDWIDTH_SCHEDULE = []
+# Квота YouTube Data API (одиниць на добу) і вартість videos.insert
+YOUTUBE_DAILY_QUOTA = 10000
+UPLOAD_QUOTA_COST = 1600
+
+# True — зважене справедливе планування між партіями (вага = пріоритет партії), False — FIFO за publish_at
+QUEUE_FAIR_SCHEDULING = True
+
+# Відкладене завантаження: задача йде в аплоад, лише коли до publish_at лишилось <= N днів
+# (None — завантажувати одразу); рендер стартує ще на PRERENDER_LOOKAHEAD_DAYS раніше
+UPLOAD_HORIZON_DAYS = None
+PRERENDER_LOOKAHEAD_DAYS = 2
+
+# PRAGMA для кожного з'єднання з queue.db; None — налаштування SQLite за замовчуванням
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # читачі (GUI, status) не блокують воркерів
+    "synchronous": "NORMAL",  # у WAL достатньо для цілісності після збою
+    "cache_size": -65536,  # KiB
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,  # мс очікування замість "database is locked"
+}
+
+# Оренда задач воркером (секунди)
+JOB_LEASE_SECONDS = 300
+JOB_HEARTBEAT_SECONDS = 60
+LEASE_REAPER_SECONDS = 120
+MAX_LEASE_RECLAIMS = 3
+
+# Бюджет диска для рендерингу (MB)
+RENDER_MIN_FREE_MB = 2048
+RENDER_MAX_INFLIGHT_MB = 20480
+RENDER_BUDGET_POLL_SECONDS = 15
+RENDER_VIDEO_KBPS_ESTIMATE = 2500
+
+# Логи
+LOG_BUFFER_LINES = 2000
+LOG_WIDGET_MAX_LINES = 1000
+LOG_DRAIN_INTERVAL_MS = 250
+LOG_FILE_MAX_MB = 5
+LOG_FILE_BACKUPS = 5
+
+# Шина подій воркера
+EVENT_QUEUE_SIZE = 256
+
+# ffprobe під час постановки в чергу і прогноз ETA
+PROBE_WORKERS = 4
+PLANNER_HISTORY_JOBS = 50
+# Поки немає історії: секунди рендеру на секунду аудіо і швидкість аплоаду (kbit/s)
+PLANNER_DEFAULT_RENDER_FACTOR = 0.25
+PLANNER_DEFAULT_UPLOAD_KBPS = 20000
+
+# Пресети зберігаються в queue.db; як часто перевіряти зміни з інших процесів (секунди)
+PRESET_REFRESH_SECONDS = 1.0
\ No newline at end of file
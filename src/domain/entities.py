@@ -21,6 +21,51 @@ class VideoMetadata:
     privacy: str = "private"
 
 
+@dataclass(frozen=True)
+class RenderTarget:
+    name: str
+    width: int
+    height: int
+    kind: str = "video"  # "video" | "image"
+
+    @property
+    def is_vertical(self) -> bool:
+        return self.height > self.width
+
+
+@dataclass
+class MediaInfo:
+    duration_sec: float
+    bitrate: Optional[int] = None
+    size_bytes: Optional[int] = None
+
+
+@dataclass
+class Batch:
+    name: str
+    preset_rotation: list[dict[str, str]] = field(default_factory=list)
+    upload_interval: int = 1
+    channel: Optional[str] = None
+    priority: int = 1  # вага у справедливому плануванні між партіями
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    vtime: float = 0.0  # віртуальний час планувальника (лише для читання)
+
+
+@dataclass
+class BatchProgress:
+    batch: Batch
+    counts: dict[JobStatus, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def done(self) -> int:
+        return self.counts.get(JobStatus.COMPLETED, 0) + self.counts.get(JobStatus.FAILED, 0)
+
+
 @dataclass
 class UploadJob:
     audio_path: Path
@@ -32,16 +77,40 @@ class UploadJob:
     remote_video_id: Optional[str] = None
     error_message: Optional[str] = None
     retry_count: int = 0
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    render_targets: list[str] = field(default_factory=list)
+    parent_id: Optional[int] = None
+    video_path: Optional[Path] = None  # вже відрендерене відео (вихід multi-output рендеру)
+    batch_id: Optional[int] = None
+    priority: int = 1  # вищий — раніше: усередині партії, а в режимі FIFO — по всій черзі
+    media: Optional[MediaInfo] = None  # результат ffprobe під час постановки в чергу
+    # Фактичний час етапів — історія для планувальника черги
+    render_seconds: Optional[float] = None
+    upload_seconds: Optional[float] = None
+    upload_bytes: Optional[int] = None
+    completed_at: Optional[datetime] = None
 
     def mark_processing(self):
         self.status = JobStatus.PROCESSING
 
+    def mark_pending(self):
+        self.status = JobStatus.PENDING
+        self.release_lease()
+
     def mark_completed(self, remote_id: str):
         self.status = JobStatus.COMPLETED
         self.remote_video_id = remote_id
         self.error_message = None
+        self.completed_at = datetime.now()
+        self.release_lease()
 
     def mark_failed(self, error: str):
 
         self.status = JobStatus.FAILED
-        self.error_message = str(error)
\ No newline at end of file
+        self.error_message = str(error)
+        self.release_lease()
+
+    def release_lease(self):
+        self.worker_id = None
+        self.lease_expires_at = None
\ No newline at end of file
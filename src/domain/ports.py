@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from .entities import UploadJob
+from typing import Any, Callable, Optional
+from .entities import Batch, BatchProgress, JobStatus, MediaInfo, RenderTarget, UploadJob
+
+
+# (частка 0..1, додаткова статистика)
+ProgressCallback = Callable[[float, dict[str, Any]], None]
 
 
 class JobRepositoryPort(ABC):
@@ -9,17 +14,86 @@ class JobRepositoryPort(ABC):
     def add(self, job: UploadJob) -> int: ...
 
     @abstractmethod
-    def get_next_pending(self) -> Optional[UploadJob]: ...
+    def add_batch(self, batch: Batch) -> int: ...
+
+    @abstractmethod
+    def get_batches(self) -> list[Batch]: ...
+
+    @abstractmethod
+    def get_batch_progress(self) -> list[BatchProgress]: ...
+
+    @abstractmethod
+    def claim_next(self, worker_id: str, lease_seconds: int, publish_before: Optional[datetime] = None,
+                   rendered_only: bool = False) -> Optional[UploadJob]: ...
+
+    @abstractmethod
+    def claim_prerender(self, worker_id: str, lease_seconds: int,
+                        publish_after: datetime, publish_before: datetime) -> Optional[UploadJob]: ...
+
+    @abstractmethod
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: int) -> bool: ...
+
+    @abstractmethod
+    def release_expired_leases(self, max_reclaims: int) -> list[UploadJob]: ...
+
+    @abstractmethod
+    def update(self, job: UploadJob, owner: Optional[str] = None) -> bool: ...
+
+    @abstractmethod
+    def save_remote_video(self, job_id: int, owner: str, remote_video_id: str) -> bool: ...
+
+    @abstractmethod
+    def get_status_counts(self) -> dict[JobStatus, int]: ...
+
+    @abstractmethod
+    def get_children(self, parent_id: int) -> list[UploadJob]: ...
+
+    @abstractmethod
+    def get_open_jobs(self) -> list[UploadJob]: ...
+
+    @abstractmethod
+    def get_completed_history(self, limit: int) -> list[UploadJob]: ...
 
     @abstractmethod
-    def update(self, job: UploadJob): ...
+    def count_completed_since(self, moment: datetime) -> int: ...
 
 
 class RendererPort(ABC):
     @abstractmethod
-    def render(self, audio: Path, image: Path, output: Path) -> Path: ...
+    def render(self, audio: Path, image: Path, output: Path, duration_sec: Optional[float] = None) -> Path: ...
+
+    @abstractmethod
+    def render_multi(self, audio: Path, image: Path, outputs: list[tuple[RenderTarget, Path]]) -> list[Path]: ...
+
+    @abstractmethod
+    def estimate_output_size(self, duration_sec: float) -> int: ...
+
+
+class MediaProbePort(ABC):
+    @abstractmethod
+    def probe(self, path: Path) -> MediaInfo: ...
 
 
 class UploaderPort(ABC):
     @abstractmethod
-    def upload(self, video_path: Path, job: UploadJob) -> str: ...
\ No newline at end of file
+    def upload(self, video_path: Path, job: UploadJob, on_progress: Optional[ProgressCallback] = None) -> str: ...
+
+    @abstractmethod
+    def set_thumbnail(self, video_id: str, image_path: Path) -> None: ...
+
+
+class PresetStorePort(ABC):
+    @abstractmethod
+    def version(self) -> int: ...
+
+    @abstractmethod
+    def load_all(self) -> tuple[int, dict[str, dict[str, str]]]: ...
+
+    @abstractmethod
+    def save(self, name: str, fields: dict[str, str]) -> int: ...
+
+    @abstractmethod
+    def delete(self, name: str) -> int: ...
+
+    @abstractmethod
+    def import_legacy(self, presets: dict[str, dict[str, str]]) -> bool: ...
\ No newline at end of file
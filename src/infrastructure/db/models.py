@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, Text
+from sqlalchemy import Column, ForeignKey, Float, Index, Integer, String, DateTime, Enum as SQLEnum, Text
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 from src.domain.entities import JobStatus
@@ -6,6 +6,39 @@ from src.domain.entities import JobStatus
 Base = declarative_base()
 
 
+class BatchModel(Base):
+    __tablename__ = 'batches'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    channel = Column(String, nullable=True)
+    preset_rotation = Column(Text, nullable=True)  # JSON
+    upload_interval = Column(Integer, default=1, server_default="1")
+    priority = Column(Integer, default=1, server_default="1")
+    # Віртуальний час справедливого планування: += 1/priority за кожну видану задачу
+    vtime = Column(Float, default=0.0, server_default="0")
+    created_at = Column(DateTime, default=datetime.now)
+
+
+class PresetModel(Base):
+    __tablename__ = 'presets'
+
+    name = Column(String, primary_key=True)
+    title_template = Column(Text, nullable=False, default="")
+    desc_template = Column(Text, nullable=False, default="")
+    tags_template = Column(Text, nullable=False, default="")
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class PresetMetaModel(Base):
+    # Один рядок: лічильник змін пресетів для інших процесів і відмітка імпорту presets.json
+    __tablename__ = 'preset_meta'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    legacy_imported_at = Column(DateTime, nullable=True)
+
+
 class JobModel(Base):
     __tablename__ = 'upload_queue'
 
@@ -21,4 +54,35 @@ class JobModel(Base):
     status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING)
     remote_video_id = Column(String, nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.now)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.now)
+
+    # Оренда задачі воркером
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    retry_count = Column(Integer, default=0, server_default="0")
+
+    # Multi-output рендер: дочірні задачі з уже готовим відео
+    render_targets = Column(String, nullable=True)
+    parent_id = Column(Integer, ForeignKey('upload_queue.id'), nullable=True, index=True)
+    video_path = Column(String, nullable=True)
+
+    batch_id = Column(Integer, ForeignKey('batches.id'), nullable=True)
+    priority = Column(Integer, default=1, server_default="1")
+
+    # ffprobe аудіо, один раз під час постановки в чергу
+    duration_sec = Column(Float, nullable=True)
+    audio_bitrate = Column(Integer, nullable=True)
+    audio_size_bytes = Column(Integer, nullable=True)
+
+    # Час етапів виконаної задачі
+    render_seconds = Column(Float, nullable=True)
+    upload_seconds = Column(Float, nullable=True)
+    upload_bytes = Column(Integer, nullable=True)
+    completed_at = Column(DateTime, nullable=True, index=True)
+
+
+# Індекси під claim_next: справедливий вибір у межах партії та FIFO по всій черзі
+Index('ix_upload_queue_claim', JobModel.status, JobModel.batch_id, JobModel.priority.desc(), JobModel.publish_at)
+Index('ix_upload_queue_fifo', JobModel.status, JobModel.priority.desc(), JobModel.publish_at)
+# Горизонт завантаження і вікно попереднього рендеру — діапазони за publish_at
+Index('ix_upload_queue_publish', JobModel.status, JobModel.publish_at)
\ No newline at end of file
@@ -0,0 +1,99 @@
+from datetime import datetime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker
+from src.domain.ports import PresetStorePort
+from src.infrastructure.db.models import Base, PresetMetaModel, PresetModel
+
+_FIELDS = ("title_template", "desc_template", "tags_template")
+
+
+class SqlitePresetStore(PresetStorePort):
+    """
+    Presets in the queue database. Every change bumps ``preset_meta.version``
+    in the same transaction, so other processes detect edits with a single
+    cheap read and SQLite's journal keeps a crash from leaving a torn file.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        Base.metadata.create_all(self.engine, tables=[PresetModel.__table__, PresetMetaModel.__table__])
+        self.Session = sessionmaker(bind=self.engine)
+
+        with self.engine.begin() as conn:
+            conn.execute(sqlite_insert(PresetMetaModel).values(id=1, version=0).on_conflict_do_nothing())
+
+    def version(self) -> int:
+        session = self.Session()
+        version = session.query(PresetMetaModel.version).filter(PresetMetaModel.id == 1).scalar()
+        session.close()
+        return version or 0
+
+    def load_all(self):
+        session = self.Session()
+        # Версію читаємо першою: якщо запис вклиниться між запитами, наступне опитування
+        # побачить нову версію і перечитає ще раз, а не залишить застарілий кеш
+        version = session.query(PresetMetaModel.version).filter(PresetMetaModel.id == 1).scalar() or 0
+        presets = {
+            m.name: {field: getattr(m, field) or "" for field in _FIELDS}
+            for m in session.query(PresetModel).all()
+        }
+        session.close()
+        return version, presets
+
+    def save(self, name: str, fields: dict[str, str]) -> int:
+        session = self.Session()
+        try:
+            # Спершу UPDATE лічильника: транзакція бере блокування на запис до читання рядка,
+            # тож паралельні збереження того самого імені з різних процесів не конфліктують
+            version = self._bump(session)
+            model = session.get(PresetModel, name)
+            if model is None:
+                model = PresetModel(name=name)
+                session.add(model)
+            for field in _FIELDS:
+                setattr(model, field, fields.get(field) or "")
+            session.commit()
+            return version
+        finally:
+            session.close()
+
+    def delete(self, name: str) -> int:
+        session = self.Session()
+        try:
+            deleted = session.query(PresetModel).filter(PresetModel.name == name).delete()
+            version = self._bump(session) if deleted else self._current(session)
+            session.commit()
+            return version
+        finally:
+            session.close()
+
+    def import_legacy(self, presets: dict[str, dict[str, str]]) -> bool:
+        session = self.Session()
+        try:
+            # Умовний UPDATE — лише один процес виконає імпорт, навіть якщо стартують разом
+            claimed = session.query(PresetMetaModel) \
+                .filter(PresetMetaModel.id == 1, PresetMetaModel.legacy_imported_at.is_(None)) \
+                .update({PresetMetaModel.legacy_imported_at: datetime.now()}, synchronize_session=False)
+            if not claimed:
+                session.rollback()
+                return False
+
+            for name, fields in presets.items():
+                if session.get(PresetModel, name) is None:
+                    session.add(PresetModel(name=name, **{field: fields.get(field) or "" for field in _FIELDS}))
+            self._bump(session)
+            session.commit()
+            return True
+        finally:
+            session.close()
+
+    @staticmethod
+    def _bump(session) -> int:
+        session.query(PresetMetaModel) \
+            .filter(PresetMetaModel.id == 1) \
+            .update({PresetMetaModel.version: PresetMetaModel.version + 1}, synchronize_session=False)
+        return SqlitePresetStore._current(session)
+
+    @staticmethod
+    def _current(session) -> int:
+        return session.query(PresetMetaModel.version).filter(PresetMetaModel.id == 1).scalar() or 0
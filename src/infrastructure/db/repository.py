@@ -1,16 +1,100 @@
-from sqlalchemy import create_engine
+import json
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional
+from sqlalchemy import create_engine, event, func, inspect, or_, select, text
 from sqlalchemy.orm import sessionmaker
 from src.domain.ports import JobRepositoryPort
-from src.domain.entities import UploadJob, VideoMetadata, JobStatus
-from src.infrastructure.db.models import Base, JobModel
+from src.domain.entities import Batch, BatchProgress, MediaInfo, UploadJob, VideoMetadata, JobStatus
+from src.infrastructure.db.models import Base, BatchModel, JobModel
 from pathlib import Path
 
 
+_JOBS = JobModel.__table__
+_BATCHES = BatchModel.__table__
+_IMPORT_BATCH = "Imported queue"
+
+
+def _apply_pragmas(pragmas: dict, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
 class SqliteRepository(JobRepositoryPort):
-    def __init__(self, db_path: str):
+    """
+    Job queue in SQLite. ``pragmas`` are applied to every new pooled
+    connection (None keeps SQLite's defaults). The hot worker operations —
+    claim, heartbeat and update — run as Core statements on a pooled
+    connection; the rest go through short-lived ORM sessions.
+    """
+
+    def __init__(self, db_path: str, fair_scheduling: bool = True, pragmas: Optional[dict] = None):
         self.engine = create_engine(db_path)
+        if pragmas:
+            event.listen(self.engine, "connect", partial(_apply_pragmas, pragmas))
+        self.fair_scheduling = fair_scheduling
         Base.metadata.create_all(self.engine)
+        self._migrate()
         self.Session = sessionmaker(bind=self.engine)
+        self._adopt_orphan_jobs()
+
+    def _migrate(self):
+        # create_all не додає нові колонки до вже існуючих таблиць
+        inspector = inspect(self.engine)
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                existing = {c["name"] for c in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} " \
+                          f"{column.type.compile(dialect=self.engine.dialect)}"
+                    if column.server_default is not None:
+                        ddl += f" DEFAULT {column.server_default.arg}"
+                    conn.execute(text(ddl))
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+
+    def _adopt_orphan_jobs(self):
+        # Задачі, створені до появи партій, збираємо в одну партію, щоб їх бачив справедливий claim
+        with self.engine.begin() as conn:
+            if conn.execute(select(_JOBS.c.id).where(_JOBS.c.batch_id.is_(None)).limit(1)).first() is None:
+                return
+
+            # Порожній UPDATE бере блокування на запис до читання: процеси, що стартують разом
+            # (GUI і `cli run`), проходять по черзі і не створюють дві партії імпорту
+            conn.execute(_BATCHES.update().where(_BATCHES.c.name == _IMPORT_BATCH).values(name=_BATCHES.c.name))
+            batch_id = conn.execute(
+                select(_BATCHES.c.id).where(_BATCHES.c.name == _IMPORT_BATCH).order_by(_BATCHES.c.id).limit(1)
+            ).scalar()
+            if batch_id is None:
+                batch_id = conn.execute(
+                    _BATCHES.insert().values(name=_IMPORT_BATCH, vtime=0.0)
+                ).inserted_primary_key[0]
+            conn.execute(_JOBS.update().where(_JOBS.c.batch_id.is_(None)).values(batch_id=batch_id))
+
+    def add_batch(self, batch: Batch) -> int:
+        session = self.Session()
+        # Нова партія стартує з мінімального віртуального часу активних партій,
+        # інакше вона забирала б усі claim, доки не наздожене старі
+        start_vtime = session.query(func.min(BatchModel.vtime)) \
+            .filter(BatchModel.id.in_(self._active_batch_ids(self._claimable()))) \
+            .scalar()
+        model = BatchModel(
+            name=batch.name,
+            channel=batch.channel,
+            preset_rotation=json.dumps(batch.preset_rotation) if batch.preset_rotation else None,
+            upload_interval=batch.upload_interval,
+            priority=max(batch.priority, 1),
+            vtime=start_vtime or 0.0
+        )
+        session.add(model)
+        session.commit()
+        batch_id = model.id
+        session.close()
+        return batch_id
 
     def add(self, job: UploadJob) -> int:
         session = self.Session()
@@ -21,7 +105,15 @@ class SqliteRepository(JobRepositoryPort):
             description=job.metadata.description,
             tags=",".join(job.metadata.tags),
             publish_at=job.publish_at,
-            status=job.status
+            status=job.status,
+            render_targets=",".join(job.render_targets) or None,
+            parent_id=job.parent_id,
+            video_path=str(job.video_path) if job.video_path else None,
+            duration_sec=job.media.duration_sec if job.media else None,
+            audio_bitrate=job.media.bitrate if job.media else None,
+            audio_size_bytes=job.media.size_bytes if job.media else None,
+            batch_id=job.batch_id,
+            priority=job.priority
         )
         session.add(model)
         session.commit()
@@ -29,18 +121,251 @@ class SqliteRepository(JobRepositoryPort):
         session.close()
         return job_id
 
-    def get_next_pending(self):
+    def claim_next(self, worker_id: str, lease_seconds: int, publish_before: Optional[datetime] = None,
+                   rendered_only: bool = False):
+        # Гарячий шлях воркерів: Core-запити на з'єднанні з пулу, без ORM-сесії та identity map
+        with self.engine.connect() as conn:
+            while True:
+                candidate_id, batch_id = self._next_candidate(conn, self._claimable(publish_before, rendered_only))
+                if candidate_id is None:
+                    return None
+
+                job = self._claim(conn, candidate_id, worker_id, lease_seconds)
+                if job is None:
+                    continue
+
+                if batch_id is not None:
+                    conn.execute(
+                        _BATCHES.update()
+                        .where(_BATCHES.c.id == batch_id)
+                        .values(vtime=_BATCHES.c.vtime + 1.0 / func.max(_BATCHES.c.priority, 1))
+                    )
+                conn.commit()
+                return job
+
+    def claim_prerender(self, worker_id: str, lease_seconds: int, publish_after: datetime, publish_before: datetime):
+        # Рендер наперед не є чергою справедливого планування: найближчі publish_at першими, vtime не змінюється
+        with self.engine.connect() as conn:
+            while True:
+                candidate_id = conn.execute(
+                    select(_JOBS.c.id)
+                    .where(_JOBS.c.status == JobStatus.PENDING,
+                           _JOBS.c.video_path.is_(None),
+                           _JOBS.c.publish_at > publish_after,
+                           _JOBS.c.publish_at <= publish_before)
+                    .order_by(_JOBS.c.publish_at, _JOBS.c.priority.desc())
+                    .limit(1)
+                ).scalar()
+                if candidate_id is None:
+                    return None
+
+                job = self._claim(conn, candidate_id, worker_id, lease_seconds)
+                if job is not None:
+                    conn.commit()
+                    return job
+
+    def _claim(self, conn, job_id: int, worker_id: str, lease_seconds: int) -> Optional[UploadJob]:
+        # Умовний UPDATE: якщо інший воркер встиг першим, rowcount == 0
+        claimed = conn.execute(
+            _JOBS.update()
+            .where(_JOBS.c.id == job_id, _JOBS.c.status == JobStatus.PENDING)
+            .values(status=JobStatus.PROCESSING,
+                    worker_id=worker_id,
+                    lease_expires_at=datetime.now() + timedelta(seconds=lease_seconds))
+        ).rowcount
+        if not claimed:
+            conn.rollback()
+            return None
+        row = conn.execute(select(_JOBS).where(_JOBS.c.id == job_id)).first()
+        return self._to_entity(row)
+
+    def _next_candidate(self, conn, claimable: list):
+        pending = select(_JOBS.c.id, _JOBS.c.batch_id).where(*claimable)
+
+        if self.fair_scheduling:
+            # Зважене справедливе планування: партія з найменшим віртуальним часом,
+            # далі — найвищий пріоритет задачі і найраніший publish_at усередині неї
+            batch_id = conn.execute(
+                select(_BATCHES.c.id)
+                .where(_BATCHES.c.id.in_(self._active_batch_ids(claimable)))
+                .order_by(_BATCHES.c.vtime, _BATCHES.c.priority.desc(), _BATCHES.c.id)
+                .limit(1)
+            ).scalar()
+            if batch_id is not None:
+                pending = pending.where(_JOBS.c.batch_id == batch_id)
+
+        row = conn.execute(pending.order_by(_JOBS.c.priority.desc(), _JOBS.c.publish_at).limit(1)).first()
+        return (row.id, row.batch_id) if row else (None, None)
+
+    @staticmethod
+    def _active_batch_ids(claimable: list):
+        # Партія без жодної придатної задачі (усі за горизонтом чи ще не відрендерені) не бере участі
+        # у виборі — інакше claim повертав би порожньо
+        return select(_JOBS.c.batch_id) \
+            .where(*claimable, _JOBS.c.batch_id.isnot(None)) \
+            .distinct() \
+            .scalar_subquery()
+
+    @staticmethod
+    def _claimable(publish_before: Optional[datetime] = None, rendered_only: bool = False) -> list:
+        conditions = [_JOBS.c.status == JobStatus.PENDING]
+        if publish_before is not None:
+            conditions.append(SqliteRepository._within_horizon(publish_before))
+        if rendered_only:
+            # Лише задачі з готовим відео (дочірні, відрендерені наперед) — їм не потрібен бюджет рендеру
+            conditions.append(_JOBS.c.video_path.isnot(None))
+        return conditions
+
+    @staticmethod
+    def _within_horizon(publish_before: datetime):
+        # Без publish_at задача публікується одразу — вона завжди в межах горизонту
+        return or_(_JOBS.c.publish_at.is_(None), _JOBS.c.publish_at <= publish_before)
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+        with self.engine.begin() as conn:
+            renewed = conn.execute(
+                _JOBS.update()
+                .where(_JOBS.c.id == job_id,
+                       _JOBS.c.worker_id == worker_id,
+                       _JOBS.c.status == JobStatus.PROCESSING)
+                .values(lease_expires_at=datetime.now() + timedelta(seconds=lease_seconds))
+            ).rowcount
+        return renewed == 1
+
+    def release_expired_leases(self, max_reclaims: int):
+        now = datetime.now()
+        reclaimed = []
+        with self.engine.begin() as conn:
+            expired = conn.execute(
+                select(_JOBS).where(_JOBS.c.status == JobStatus.PROCESSING,
+                                    or_(_JOBS.c.lease_expires_at.is_(None), _JOBS.c.lease_expires_at < now))
+            ).all()
+
+            for row in expired:
+                retries = (row.retry_count or 0) + 1
+                values = dict(status=JobStatus.PENDING, retry_count=retries, worker_id=None, lease_expires_at=None)
+                if retries > max_reclaims:
+                    values.update(status=JobStatus.FAILED,
+                                  error_message=f"Abandoned after {max_reclaims} expired leases")
+
+                # Умовний UPDATE за прочитаною орендою: якщо інший reaper або heartbeat встиг першим, rowcount == 0
+                released = conn.execute(
+                    _JOBS.update()
+                    .where(_JOBS.c.id == row.id,
+                           _JOBS.c.status == JobStatus.PROCESSING,
+                           _JOBS.c.worker_id == row.worker_id,
+                           _JOBS.c.lease_expires_at == row.lease_expires_at)
+                    .values(**values)
+                ).rowcount
+                if released:
+                    reclaimed.append(self._to_entity(row))
+        return reclaimed
+
+    def update(self, job: UploadJob, owner: Optional[str] = None) -> bool:
+        # Прямий UPDATE колонок — рядок не завантажується в сесію лише для того, щоб його змінити
+        values = dict(
+            status=job.status,
+            # ID вже завантаженого відео не затирається — інакше наступний власник завантажив би його вдруге
+            remote_video_id=func.coalesce(job.remote_video_id, _JOBS.c.remote_video_id),
+            error_message=job.error_message,
+            retry_count=job.retry_count,
+            render_seconds=job.render_seconds,
+            upload_seconds=job.upload_seconds,
+            upload_bytes=job.upload_bytes,
+            completed_at=job.completed_at,
+            video_path=str(job.video_path) if job.video_path else None
+        )
+        if job.status != JobStatus.PROCESSING:
+            values.update(worker_id=None, lease_expires_at=None)
+
+        statement = _JOBS.update().where(_JOBS.c.id == job.id)
+        if owner is not None:
+            # Вихід з PROCESSING пише лише поточний власник оренди, а не воркер, у якого її вже забрали
+            statement = statement.where(_JOBS.c.status == JobStatus.PROCESSING, _JOBS.c.worker_id == owner)
+        with self.engine.begin() as conn:
+            updated = conn.execute(statement.values(**values)).rowcount
+        return updated == 1
+
+    def save_remote_video(self, job_id: int, owner: str, remote_video_id: str) -> bool:
+        with self.engine.begin() as conn:
+            completed = conn.execute(
+                _JOBS.update()
+                .where(_JOBS.c.id == job_id, _JOBS.c.status == JobStatus.PROCESSING, _JOBS.c.worker_id == owner)
+                .values(status=JobStatus.COMPLETED, remote_video_id=remote_video_id, error_message=None,
+                        completed_at=datetime.now(), worker_id=None, lease_expires_at=None)
+            ).rowcount
+            if not completed:
+                # Оренду вже забрали — зберігаємо хоча б ID, щоб наступний власник не завантажував відео повторно
+                conn.execute(_JOBS.update().where(_JOBS.c.id == job_id).values(remote_video_id=remote_video_id))
+        return completed == 1
+
+    def get_status_counts(self):
+        session = self.Session()
+        rows = session.query(JobModel.status, func.count(JobModel.id)) \
+            .group_by(JobModel.status) \
+            .all()
+        session.close()
+        return {status: count for status, count in rows}
+
+    def get_open_jobs(self):
         session = self.Session()
-        model = session.query(JobModel) \
-            .filter(JobModel.status == JobStatus.PENDING) \
+        models = session.query(JobModel) \
+            .filter(JobModel.status.in_([JobStatus.PENDING, JobStatus.PROCESSING])) \
             .order_by(JobModel.publish_at) \
-            .first()
+            .all()
+        jobs = [self._to_entity(m) for m in models]
+        session.close()
+        return jobs
 
-        if not model:
-            session.close()
-            return None
+    def get_completed_history(self, limit: int):
+        session = self.Session()
+        models = session.query(JobModel) \
+            .filter(JobModel.status == JobStatus.COMPLETED, JobModel.completed_at.isnot(None)) \
+            .order_by(JobModel.completed_at.desc()) \
+            .limit(limit) \
+            .all()
+        jobs = [self._to_entity(m) for m in models]
+        session.close()
+        return jobs
+
+    def count_completed_since(self, moment: datetime) -> int:
+        session = self.Session()
+        count = session.query(func.count(JobModel.id)) \
+            .filter(JobModel.status == JobStatus.COMPLETED, JobModel.completed_at >= moment) \
+            .scalar()
+        session.close()
+        return count or 0
 
-        entity = UploadJob(
+    def get_batches(self):
+        session = self.Session()
+        batches = [self._to_batch(m) for m in session.query(BatchModel).order_by(BatchModel.id).all()]
+        session.close()
+        return batches
+
+    def get_batch_progress(self):
+        session = self.Session()
+        rows = session.query(JobModel.batch_id, JobModel.status, func.count(JobModel.id)) \
+            .group_by(JobModel.batch_id, JobModel.status) \
+            .all()
+        progress = {m.id: BatchProgress(batch=self._to_batch(m))
+                    for m in session.query(BatchModel).order_by(BatchModel.id).all()}
+        session.close()
+
+        for batch_id, status, count in rows:
+            if batch_id in progress:
+                progress[batch_id].counts[status] = count
+        return list(progress.values())
+
+    def get_children(self, parent_id: int):
+        session = self.Session()
+        models = session.query(JobModel).filter(JobModel.parent_id == parent_id).all()
+        children = [self._to_entity(m) for m in models]
+        session.close()
+        return children
+
+    def _to_entity(self, model) -> UploadJob:
+        # model — ORM-об'єкт або Core-рядок upload_queue: імена атрибутів збігаються з колонками
+        return UploadJob(
             id=model.id,
             audio_path=Path(model.audio_path),
             image_path=Path(model.image_path),
@@ -51,17 +376,35 @@ class SqliteRepository(JobRepositoryPort):
             ),
             publish_at=model.publish_at,
             status=model.status,
-            error_message=model.error_message
+            remote_video_id=model.remote_video_id,
+            error_message=model.error_message,
+            retry_count=model.retry_count or 0,
+            worker_id=model.worker_id,
+            lease_expires_at=model.lease_expires_at,
+            render_targets=model.render_targets.split(",") if model.render_targets else [],
+            parent_id=model.parent_id,
+            video_path=Path(model.video_path) if model.video_path else None,
+            batch_id=model.batch_id,
+            priority=model.priority if model.priority is not None else 1,
+            media=MediaInfo(
+                duration_sec=model.duration_sec,
+                bitrate=model.audio_bitrate,
+                size_bytes=model.audio_size_bytes
+            ) if model.duration_sec is not None else None,
+            render_seconds=model.render_seconds,
+            upload_seconds=model.upload_seconds,
+            upload_bytes=model.upload_bytes,
+            completed_at=model.completed_at
         )
-        session.close()
-        return entity
 
-    def update(self, job: UploadJob):
-        session = self.Session()
-        model = session.query(JobModel).get(job.id)
-        if model:
-            model.status = job.status
-            model.remote_video_id = job.remote_video_id
-            model.error_message = job.error_message
-            session.commit()
-        session.close()
\ No newline at end of file
+    def _to_batch(self, model: BatchModel) -> Batch:
+        return Batch(
+            id=model.id,
+            name=model.name,
+            channel=model.channel,
+            preset_rotation=json.loads(model.preset_rotation) if model.preset_rotation else [],
+            upload_interval=model.upload_interval or 1,
+            priority=model.priority or 1,
+            created_at=model.created_at,
+            vtime=model.vtime or 0.0
+        )
@@ -0,0 +1,35 @@
+import json
+import subprocess
+from pathlib import Path
+from src.domain.entities import MediaInfo
+from src.domain.ports import MediaProbePort
+
+
+class FFprobeProber(MediaProbePort):
+    def __init__(self, ffprobe_bin: str = "ffprobe"):
+        self._bin = ffprobe_bin
+
+    def probe(self, path: Path) -> MediaInfo:
+        cmd = [
+            self._bin, "-v", "error",
+            "-show_entries", "format=duration,bit_rate,size",
+            "-of", "json",
+            str(path)
+        ]
+
+        try:
+            result = subprocess.run(cmd, check=True, capture_output=True)
+            fmt = json.loads(result.stdout.decode("utf-8")).get("format", {})
+            return MediaInfo(
+                duration_sec=float(fmt["duration"]),
+                bitrate=int(fmt["bit_rate"]) if fmt.get("bit_rate") else None,
+                size_bytes=int(fmt["size"]) if fmt.get("size") else None
+            )
+        except subprocess.CalledProcessError as e:
+            error_msg = e.stderr.decode("utf-8") if e.stderr else str(e)
+            raise RuntimeError(f"FFprobe error: {error_msg}")
+        except OSError as e:
+            # Немає бінарника ffprobe (FileNotFoundError) чи його не вдалося запустити
+            raise RuntimeError(f"FFprobe could not be started ({self._bin}): {e}")
+        except (KeyError, ValueError) as e:
+            raise RuntimeError(f"FFprobe returned no duration for {path.name}: {e}")
\ No newline at end of file
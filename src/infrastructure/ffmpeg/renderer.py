@@ -1,18 +1,60 @@
+import math
+import os
+import shutil
 import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from src.domain.ports import RendererPort
+from typing import Optional
+from src.domain.entities import RenderTarget
+from src.domain.ports import MediaProbePort, RendererPort
+
+
+def _fit(width: int, height: int) -> str:
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:black"
+    )
+
+
+def _tee_escape(path: Path) -> str:
+    # Специфікацію tee розбирає av_get_token, тож зворотний слеш і спецсимволи екрануємо
+    escaped = path.as_posix()
+    for ch in "\\'[]|":
+        escaped = escaped.replace(ch, "\\" + ch)
+    return escaped
 
 
 class FFmpegRenderer(RendererPort):
-    def __init__(self, ffmpeg_bin: str = "ffmpeg"):
+    _AUDIO_KBPS = 192
+    _CONTAINER_OVERHEAD = 1.02
+    _FPS = 25
+    _GOP_FRAMES = 250  # як у x264 за замовчуванням; межі сегментів кратні GOP
+
+    def __init__(
+        self,
+        ffmpeg_bin: str = "ffmpeg",
+        video_kbps_estimate: int = 2500,
+        prober: Optional[MediaProbePort] = None,
+        segment_min_seconds: Optional[float] = None,
+        segments: int = 4,
+    ):
         self._bin = ffmpeg_bin
+        self._video_kbps_estimate = video_kbps_estimate
+        self._prober = prober
+        self._segment_min_seconds = segment_min_seconds
+        self._segments = segments
 
-    def render(self, audio: Path, image: Path, output: Path) -> Path:
-        filter_complex = (
-            "scale=1920:1080:force_original_aspect_ratio=decrease,"
-            "pad=1920:1080:(ow-iw)/2:(oh-ih)/2:black"
-        )
+    def estimate_output_size(self, duration_sec: float) -> int:
+        total_kbps = self._video_kbps_estimate + self._AUDIO_KBPS
+        return int(duration_sec * total_kbps * 1000 / 8 * self._CONTAINER_OVERHEAD)
+
+    def render(self, audio: Path, image: Path, output: Path, duration_sec: Optional[float] = None) -> Path:
+        duration = self._segmenting_duration(audio, duration_sec)
+        if duration:
+            return self._render_segmented(audio, image, output, duration)
+
+        filter_complex = _fit(1920, 1080)
 
         cmd = [
             self._bin, "-y",
@@ -23,16 +65,155 @@ class FFmpegRenderer(RendererPort):
             "-c:v", "libx264",
             "-tune", "stillimage",
             "-c:a", "aac",
-            "-b:a", "192k",
+            "-b:a", f"{self._AUDIO_KBPS}k",
             "-pix_fmt", "yuv420p",
             "-shortest",
             "-f", "mp4",
             str(output)
         ]
 
+        self._run(cmd)
+        return output
+
+    def render_multi(self, audio: Path, image: Path, outputs: list[tuple[RenderTarget, Path]]) -> list[Path]:
+        """
+        One FFmpeg pass for several formats: the cover is decoded once and split,
+        every video stream and a single AAC encode go through the tee muxer, so
+        each MP4 picks its own video stream plus the shared audio.
+        """
+        videos = [(t, p) for t, p in outputs if t.kind == "video"]
+        images = [(t, p) for t, p in outputs if t.kind == "image"]
+        if not videos:
+            raise ValueError("render_multi needs at least one video target")
+
+        branches = len(videos) + len(images)
+        graph = [f"[0:v]split={branches}" + "".join(f"[s{i}]" for i in range(branches))]
+        for i, (target, _) in enumerate(videos + images):
+            graph.append(f"[s{i}]{_fit(target.width, target.height)}[o{i}]")
+
+        cmd = [
+            self._bin, "-y",
+            "-loop", "1",
+            "-i", str(image),
+            "-i", str(audio),
+            "-filter_complex", ";".join(graph),
+        ]
+
+        for i in range(len(videos)):
+            cmd += ["-map", f"[o{i}]"]
+        slaves = "|".join(
+            f"[f=mp4:select=\\'v:{i},a\\']{_tee_escape(path)}" for i, (_, path) in enumerate(videos)
+        )
+        cmd += [
+            "-map", "1:a",
+            "-c:v", "libx264",
+            "-tune", "stillimage",
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac",
+            "-b:a", f"{self._AUDIO_KBPS}k",
+            # tee не передає енкодерам вимоги MP4, тож заголовки кодеків вмикаємо явно
+            "-flags", "+global_header",
+            "-shortest",
+            "-f", "tee", slaves,
+        ]
+
+        for j, (_, path) in enumerate(images):
+            cmd += ["-map", f"[o{len(videos) + j}]", "-frames:v", "1", "-q:v", "2", str(path)]
+
+        self._run(cmd)
+        return [path for _, path in outputs]
+
+    def _segmenting_duration(self, audio: Path, known: Optional[float] = None) -> Optional[float]:
+        if not self._segment_min_seconds or self._segments < 2:
+            return None
+        duration = known
+        if duration is None:
+            if not self._prober:
+                return None
+            try:
+                duration = self._prober.probe(audio).duration_sec
+            except Exception:
+                # Без тривалості — звичайний рендер одним процесом
+                return None
+        return duration if duration >= self._segment_min_seconds else None
+
+    def _render_segmented(self, audio: Path, image: Path, output: Path, duration: float) -> Path:
+        """
+        Long mixes: the video track is split into GOP-aligned segments encoded by
+        parallel FFmpeg processes, while the audio is encoded once as a whole (no
+        seams in the AAC stream). Segments are joined with the concat demuxer and
+        muxed with the audio by stream copy.
+        """
+        work_dir = output.parent / f"{output.stem}.segments"
+        work_dir.mkdir(exist_ok=True)
+
+        total_frames = math.ceil(duration * self._FPS)
+        per_segment = math.ceil(total_frames / self._segments / self._GOP_FRAMES) * self._GOP_FRAMES
+        frame_counts = []
+        remaining = total_frames
+        while remaining > 0:
+            frame_counts.append(min(per_segment, remaining))
+            remaining -= frame_counts[-1]
+
+        threads = max(1, (os.cpu_count() or 1) // len(frame_counts))
+        segment_files = [work_dir / f"seg_{i:03d}.mp4" for i in range(len(frame_counts))]
+        audio_file = work_dir / "audio.m4a"
+
+        jobs = [
+            [
+                self._bin, "-y",
+                "-loop", "1", "-framerate", str(self._FPS),
+                "-i", str(image),
+                "-vf", _fit(1920, 1080),
+                "-frames:v", str(frames),
+                "-c:v", "libx264",
+                "-tune", "stillimage",
+                "-g", str(self._GOP_FRAMES),
+                "-pix_fmt", "yuv420p",
+                "-threads", str(threads),
+                "-an",
+                str(path)
+            ]
+            for frames, path in zip(frame_counts, segment_files)
+        ]
+        jobs.append([
+            self._bin, "-y",
+            "-i", str(audio),
+            "-vn",
+            "-c:a", "aac",
+            "-b:a", f"{self._AUDIO_KBPS}k",
+            str(audio_file)
+        ])
+
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                for future in [pool.submit(self._run, cmd) for cmd in jobs]:
+                    future.result()
+
+            concat_list = work_dir / "segments.txt"
+            concat_list.write_text(
+                "".join(f"file '{path.name}'\n" for path in segment_files), encoding="utf-8"
+            )
+
+            self._run([
+                self._bin, "-y",
+                "-f", "concat", "-safe", "0",
+                "-i", str(concat_list),
+                "-i", str(audio_file),
+                "-map", "0:v", "-map", "1:a",
+                "-c", "copy",
+                "-shortest",
+                "-movflags", "+faststart",
+                "-f", "mp4",
+                str(output)
+            ])
             return output
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _run(self, cmd: list[str]) -> None:
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
             error_msg = e.stderr.decode("utf-8") if e.stderr else str(e)
             raise RuntimeError(f"FFmpeg render error: {error_msg}")
\ No newline at end of file
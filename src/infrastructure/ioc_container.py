@@ -1,10 +1,21 @@
 from pathlib import Path
+from typing import Optional
 
+from src import config
+from src.application.bandwidth import BandwidthLimiter, RateWindow
+from src.application.events import EventBus, OverflowPolicy, Subscriber, Subscription
+from src.application.planner import QueuePlanner
 from src.application.scheduler import BatchScheduler
-from src.application.worker import QueueWorker
+from src.application.worker import JobEvent, QueueWorker
 from src.application.presets import PresetManager
+from src.application.render_budget import RenderBudget
+from src.domain.entities import RenderTarget
+from src.domain.ports import UploaderPort
+from src.infrastructure.db.preset_store import SqlitePresetStore
 from src.infrastructure.db.repository import SqliteRepository
+from src.infrastructure.ffmpeg.probe import FFprobeProber
 from src.infrastructure.ffmpeg.renderer import FFmpegRenderer
+from src.infrastructure.log_sink import RingLogSink
 from src.infrastructure.youtube.uploader import YouTubeUploader
 
 
@@ -17,25 +28,137 @@ class Container:
 
         self._ensure_directories()
 
-        self.repo = SqliteRepository(f"sqlite:///{self.data_dir}/queue.db")
+        self.event_bus = EventBus(
+            coalesce_events={JobEvent.JOB_PROGRESS, JobEvent.RENDER_BUDGET},
+            default_max_queue=config.EVENT_QUEUE_SIZE
+        )
+
+        self.log_sink = RingLogSink(
+            capacity=config.LOG_BUFFER_LINES,
+            log_file=self.data_dir / "logs" / "worker.log",
+            max_file_bytes=config.LOG_FILE_MAX_MB * 1024 * 1024,
+            backup_count=config.LOG_FILE_BACKUPS
+        )
+
+        self.repo = SqliteRepository(
+            f"sqlite:///{self.data_dir}/queue.db",
+            fair_scheduling=config.QUEUE_FAIR_SCHEDULING,
+            pragmas=config.SQLITE_PRAGMAS
+        )
 
         ffmpeg_bin = self._get_ffmpeg_path()
-        self.renderer = FFmpegRenderer(ffmpeg_bin=ffmpeg_bin)
+        self.prober = FFprobeProber(ffprobe_bin=self._get_ffprobe_path())
+        self.renderer = FFmpegRenderer(
+            ffmpeg_bin=ffmpeg_bin,
+            video_kbps_estimate=config.RENDER_VIDEO_KBPS_ESTIMATE,
+            prober=self.prober,
+            segment_min_seconds=(config.RENDER_SEGMENT_MIN_MINUTES * 60
+                                 if config.RENDER_SEGMENT_MIN_MINUTES else None),
+            segments=config.RENDER_SEGMENTS
+        )
+        self.render_profiles = {
+            name: RenderTarget(name, width, height, kind)
+            for name, (width, height, kind) in config.RENDER_PROFILES.items()
+        }
 
-        self.uploader = YouTubeUploader(
-            secrets_file=self.root_path / "client_secrets.json",
-            token_file=self.root_path / "token.json"
+        self.render_budget = RenderBudget(
+            temp_dir=self.output_dir,
+            min_free_bytes=config.RENDER_MIN_FREE_MB * 1024 * 1024,
+            max_inflight_bytes=config.RENDER_MAX_INFLIGHT_MB * 1024 * 1024
+        )
+
+        self.bandwidth_limiter = BandwidthLimiter(
+            default_bytes_per_sec=(config.UPLOAD_BANDWIDTH_KBPS * 1000 // 8
+                                   if config.UPLOAD_BANDWIDTH_KBPS else None),
+            schedule=[RateWindow.parse(*window) for window in config.UPLOAD_BANDWIDTH_SCHEDULE]
+        )
+
+        self._shared_uploader: Optional[UploaderPort] = None
+        self.uploader = self._create_uploader()
+
+        self.preset_manager = PresetManager(
+            SqlitePresetStore(self.repo.engine),
+            legacy_path=self.data_dir / "presets.json",
+            refresh_interval=config.PRESET_REFRESH_SECONDS
         )
 
-        self.preset_manager = PresetManager(self.data_dir / "presets.json")
+        self.scheduler = BatchScheduler(self.repo, prober=self.prober, probe_workers=config.PROBE_WORKERS)
 
-        self.scheduler = BatchScheduler(self.repo)
+        self.planner = QueuePlanner(
+            repo=self.repo,
+            renderer=self.renderer,
+            daily_quota=config.YOUTUBE_DAILY_QUOTA,
+            upload_quota_cost=config.UPLOAD_QUOTA_COST,
+            render_profiles=self.render_profiles,
+            history_size=config.PLANNER_HISTORY_JOBS,
+            default_render_factor=config.PLANNER_DEFAULT_RENDER_FACTOR,
+            default_upload_bytes_per_sec=(config.UPLOAD_BANDWIDTH_KBPS
+                                          or config.PLANNER_DEFAULT_UPLOAD_KBPS) * 1000 / 8,
+            fair_scheduling=config.QUEUE_FAIR_SCHEDULING,
+            upload_horizon_days=config.UPLOAD_HORIZON_DAYS,
+            prerender_lookahead_days=config.PRERENDER_LOOKAHEAD_DAYS
+        )
 
-        self.worker = QueueWorker(
+        self.worker = self.create_worker(uploader=self.uploader)
+
+    def create_worker(self, uploader: Optional[UploaderPort] = None,
+                      log_prefix: str = "") -> QueueWorker:
+        def log(msg: str) -> None:
+            self.log_sink.write(f"{log_prefix}{msg}")
+
+        return QueueWorker(
             repo=self.repo,
             renderer=self.renderer,
-            uploader=self.uploader,
-            temp_dir=self.output_dir
+            uploader=uploader or self._create_uploader(),
+            temp_dir=self.output_dir,
+            logger_callback=log if log_prefix else self.log_sink.write,
+            status_callback=self.event_bus.publish,
+            lease_seconds=config.JOB_LEASE_SECONDS,
+            heartbeat_interval=config.JOB_HEARTBEAT_SECONDS,
+            reaper_interval=config.LEASE_REAPER_SECONDS,
+            max_lease_reclaims=config.MAX_LEASE_RECLAIMS,
+            prober=self.prober,
+            render_budget=self.render_budget,
+            budget_poll_interval=config.RENDER_BUDGET_POLL_SECONDS,
+            render_profiles=self.render_profiles,
+            upload_horizon_days=config.UPLOAD_HORIZON_DAYS,
+            prerender_lookahead_days=config.PRERENDER_LOOKAHEAD_DAYS
+        )
+
+    def subscribe(self, callback: Subscriber, overflow: OverflowPolicy = OverflowPolicy.COALESCE,
+                  max_queue: Optional[int] = None) -> Subscription:
+        return self.event_bus.subscribe(callback, max_queue=max_queue, overflow=overflow)
+
+    def close(self) -> None:
+        # Спершу шина: доставляємо події, що ще в черзі, поки лог відкритий
+        self.event_bus.close()
+        self.log_sink.close()
+
+    def _create_uploader(self) -> UploaderPort:
+        if config.UPLOADER_BACKEND == "async":
+            # Один asyncio-аплоадер на всі воркери: спільний цикл подій і пул з'єднань
+            if self._shared_uploader is None:
+                from src.infrastructure.youtube.async_uploader import AsyncYouTubeUploader
+                endpoint = {}
+                if config.YOUTUBE_API_BASE_URL:
+                    from google.auth.credentials import AnonymousCredentials
+                    endpoint = {"api_base_url": config.YOUTUBE_API_BASE_URL,
+                                "credentials_provider": AnonymousCredentials}
+                self._shared_uploader = AsyncYouTubeUploader(
+                    secrets_file=self.root_path / "client_secrets.json",
+                    token_file=self.root_path / "token.json",
+                    concurrency=config.UPLOAD_CONCURRENCY,
+                    limiter=self.bandwidth_limiter,
+                    **endpoint
+                )
+            return self._shared_uploader
+
+        # googleapiclient не потокобезпечний — кожен воркер отримує свій uploader
+        return YouTubeUploader(
+            secrets_file=self.root_path / "client_secrets.json",
+            token_file=self.root_path / "token.json",
+            limiter=self.bandwidth_limiter,
+            api_base_url=config.YOUTUBE_API_BASE_URL
         )
 
     def _ensure_directories(self):
@@ -46,4 +169,10 @@ class Container:
         local_ffmpeg = self.bin_dir / "ffmpeg.exe"
         if local_ffmpeg.exists():
             return str(local_ffmpeg)
-        return "ffmpeg"
\ No newline at end of file
+        return "ffmpeg"
+
+    def _get_ffprobe_path(self):
+        local_ffprobe = self.bin_dir / "ffprobe.exe"
+        if local_ffprobe.exists():
+            return str(local_ffprobe)
+        return "ffprobe"
\ No newline at end of file
@@ -0,0 +1,70 @@
+import logging
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+
+class RingLogSink:
+    """
+    Thread-safe, bounded log buffer between the worker and the GUI.
+
+    ``write`` never blocks on Tk or disk: lines go into a ring buffer (oldest
+    dropped when full) and, through a QueueHandler, to a rotating log file.
+    The GUI periodically calls ``drain`` and inserts everything at once.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 2000,
+        log_file: Optional[Path] = None,
+        max_file_bytes: int = 5 * 1024 * 1024,
+        backup_count: int = 5,
+    ) -> None:
+        self._buffer: deque[str] = deque(maxlen=capacity)
+        self._lock: threading.Lock = threading.Lock()
+        self._dropped: int = 0
+
+        self._file_logger: Optional[logging.Logger] = None
+        self._listener: Optional[QueueListener] = None
+        if log_file:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            file_handler = RotatingFileHandler(
+                log_file, maxBytes=max_file_bytes, backupCount=backup_count, encoding="utf-8"
+            )
+            file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            # Окремий логер поза глобальним реєстром, щоб не дублювати хендлери
+            self._file_logger = logging.Logger("yt_automator.worker", logging.INFO)
+            self._file_logger.addHandler(QueueHandler(log_queue))
+            self._listener = QueueListener(log_queue, file_handler)
+            self._listener.start()
+
+    def write(self, msg: str) -> None:
+        line = f"[{datetime.now().strftime('%H:%M:%S')}] {msg}"
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self._dropped += 1
+            self._buffer.append(line)
+
+        if self._file_logger:
+            self._file_logger.info(msg)
+
+    def drain(self) -> tuple[list[str], int]:
+        """Returns buffered lines and how many were dropped since the last drain."""
+        with self._lock:
+            lines = list(self._buffer)
+            dropped = self._dropped
+            self._buffer.clear()
+            self._dropped = 0
+        return lines, dropped
+
+    def close(self) -> None:
+        self._file_logger = None
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
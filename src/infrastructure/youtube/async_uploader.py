@@ -0,0 +1,289 @@
+import asyncio
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import aiohttp
+from google.auth.transport.requests import Request
+
+from src.application.bandwidth import BandwidthLimiter, UploadFlow
+from src.domain.entities import UploadJob
+from src.domain.ports import ProgressCallback, UploaderPort
+from src.infrastructure.youtube.auth import load_credentials
+from src.infrastructure.youtube.uploader import YouTubeUploader, build_video_resource
+
+
+class _RetryableUploadError(Exception):
+    pass
+
+
+class _SessionExpiredError(Exception):
+    pass
+
+
+@dataclass
+class _UploadSession:
+    total: int
+    url: Optional[str] = None
+    offset: int = 0
+
+
+class AsyncYouTubeUploader(UploaderPort):
+    """
+    Resumable-protocol uploader running up to ``concurrency`` uploads on one
+    asyncio loop with a shared aiohttp connection pool.
+
+    The synchronous ``upload`` (UploaderPort) submits to the background loop,
+    so any number of QueueWorker threads can share a single instance.
+    Quota and retry semantics follow YouTubeUploader: 403/429 quota errors
+    raise ``RuntimeError("YOUTUBE_QUOTA_EXCEEDED")`` without retrying, transient
+    errors get 3 attempts with 4-10s exponential backoff. Each retry resumes
+    from the last byte the server acknowledged, and progress resets the count.
+    """
+
+    _SCOPES = YouTubeUploader._SCOPES
+    _UPLOAD_PATH = "/upload/youtube/v3/videos"
+    _THUMBNAIL_PATH = "/upload/youtube/v3/thumbnails/set"
+    _CHUNK_SIZE = 1024 * 1024 * 5  # кратно 256 KB, як вимагає протокол
+    _MAX_ATTEMPTS = 3
+    _RETRY_STATUSES = {500, 502, 503, 504}
+
+    def __init__(
+        self,
+        secrets_file: Path,
+        token_file: Path,
+        concurrency: int = 4,
+        api_base_url: str = "https://www.googleapis.com",
+        credentials_provider: Optional[Callable[[], object]] = None,
+        limiter: Optional[BandwidthLimiter] = None,
+    ):
+        self._secrets_file = secrets_file
+        self._token_file = token_file
+        self._concurrency = concurrency
+        self._base_url = api_base_url.rstrip("/")
+        self._credentials_provider = credentials_provider
+        self._limiter = limiter or BandwidthLimiter()
+        self._creds = None
+        self._creds_lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # --- UploaderPort -------------------------------------------------------
+
+    def upload(self, video_path: Path, job: UploadJob, on_progress: Optional[ProgressCallback] = None) -> str:
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self.upload_async(video_path, job, on_progress), loop)
+        return future.result()
+
+    def set_thumbnail(self, video_id: str, image_path: Path) -> None:
+        loop = self._ensure_loop()
+        asyncio.run_coroutine_threadsafe(self.set_thumbnail_async(video_id, image_path), loop).result()
+
+    # --- asyncio API --------------------------------------------------------
+
+    async def upload_async(self, video_path: Path, job: UploadJob,
+                           on_progress: Optional[ProgressCallback] = None) -> str:
+        if self._http is None:
+            await self._open()
+
+        async with self._semaphore:
+            with self._limiter.open_flow() as flow:
+                body = build_video_resource(job)
+                print(f"  [YouTube] Uploading: '{body['snippet']['title']}'")
+
+                session = _UploadSession(total=video_path.stat().st_size)
+                failures = 0
+                acked_at_failure = -1
+
+                while True:
+                    try:
+                        if session.url is None:
+                            session.url = await self._start_session(body, session.total)
+                            session.offset = 0
+                        elif failures:
+                            video_id = await self._query_offset(session)
+                            if video_id:
+                                return video_id
+
+                        return await self._send_chunks(session, video_path, flow, on_progress)
+
+                    except _SessionExpiredError as e:
+                        session.url = None
+                        last_error: Exception = e
+                    except (_RetryableUploadError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        last_error = e
+
+                    # Ліміт спроб рахується з моменту останнього прогресу, а не на весь файл
+                    if session.offset > acked_at_failure:
+                        failures = 0
+                        acked_at_failure = session.offset
+                    failures += 1
+                    if failures >= self._MAX_ATTEMPTS:
+                        raise RuntimeError(f"Resumable Upload Failed: {last_error}")
+                    await asyncio.sleep(min(max(2 ** failures, 4), 10))
+
+    async def set_thumbnail_async(self, video_id: str, image_path: Path) -> None:
+        if self._http is None:
+            await self._open()
+
+        data = await asyncio.get_running_loop().run_in_executor(None, image_path.read_bytes)
+        url = f"{self._base_url}{self._THUMBNAIL_PATH}?videoId={video_id}&uploadType=media"
+
+        for attempt in range(1, self._MAX_ATTEMPTS + 1):
+            try:
+                headers = await self._auth_headers()
+                headers["Content-Type"] = "image/jpeg"
+                async with self._http.post(url, data=data, headers=headers) as resp:
+                    if resp.status in (200, 201):
+                        return
+                    self._raise_for_status(resp.status, await resp.text(), initial=True)
+            except (_RetryableUploadError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self._MAX_ATTEMPTS:
+                    raise RuntimeError(f"Thumbnail upload failed: {e}")
+                await asyncio.sleep(min(max(2 ** attempt, 4), 10))
+
+    async def close(self) -> None:
+        if self._http:
+            await self._http.close()
+            self._http = None
+
+    def shutdown(self, timeout: float = 10) -> None:
+        """Closes the connection pool and stops the background loop."""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.close(), loop).result(timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop_thread.join(timeout)
+        loop.close()
+
+    # --- protocol -----------------------------------------------------------
+
+    async def _start_session(self, body: dict, total: int) -> str:
+        headers = await self._auth_headers()
+        headers.update({
+            "Content-Type": "application/json; charset=UTF-8",
+            "X-Upload-Content-Length": str(total),
+            "X-Upload-Content-Type": "video/mp4",
+        })
+        url = f"{self._base_url}{self._UPLOAD_PATH}?uploadType=resumable&part=snippet,status"
+
+        async with self._http.post(url, data=json.dumps(body), headers=headers) as resp:
+            if resp.status == 200 and "Location" in resp.headers:
+                return resp.headers["Location"]
+            text = await resp.text()
+            self._raise_for_status(resp.status, text, initial=True)
+            raise RuntimeError(f"Resumable Upload Failed: unexpected {resp.status} | Details: {text}")
+
+    async def _send_chunks(self, session: _UploadSession, video_path: Path, flow: UploadFlow,
+                           on_progress: Optional[ProgressCallback]) -> str:
+        loop = asyncio.get_running_loop()
+        total = session.total
+        with open(video_path, "rb") as f:
+            while True:
+                f.seek(session.offset)
+                chunk = await loop.run_in_executor(None, f.read, self._CHUNK_SIZE)
+                end = session.offset + len(chunk) - 1
+
+                headers = await self._auth_headers()
+                headers["Content-Range"] = f"bytes {session.offset}-{end}/{total}" if chunk else f"bytes */{total}"
+                headers["Content-Length"] = str(len(chunk))
+
+                data = self._throttled(chunk, flow) if chunk else chunk
+                async with self._http.put(session.url, data=data, headers=headers, allow_redirects=False) as resp:
+                    if resp.status in (200, 201):
+                        return (await resp.json(content_type=None)).get("id")
+                    if resp.status == 308:
+                        session.offset = self._parse_range(resp.headers.get("Range"))
+                        if on_progress and total:
+                            on_progress(session.offset / total, {
+                                "bytes_sent": session.offset, "bytes_total": total, **flow.stats()
+                            })
+                        continue
+                    self._raise_for_status(resp.status, await resp.text())
+
+    @staticmethod
+    async def _throttled(chunk: bytes, flow: UploadFlow):
+        # Віддаємо чанк шматками, щоб ліміт тримався рівно в межах одного PUT
+        view = memoryview(chunk)
+        for start in range(0, len(chunk), BandwidthLimiter.SLICE_BYTES):
+            piece = view[start:start + BandwidthLimiter.SLICE_BYTES]
+            await flow.acquire_async(len(piece))
+            yield bytes(piece)
+
+    async def _query_offset(self, session: _UploadSession) -> Optional[str]:
+        headers = await self._auth_headers()
+        headers["Content-Range"] = f"bytes */{session.total}"
+        async with self._http.put(session.url, headers=headers, allow_redirects=False) as resp:
+            if resp.status in (200, 201):
+                session.offset = session.total
+                return (await resp.json(content_type=None)).get("id")
+            if resp.status == 308:
+                session.offset = self._parse_range(resp.headers.get("Range"))
+                return None
+            self._raise_for_status(resp.status, await resp.text())
+        return None
+
+    def _raise_for_status(self, status: int, text: str, initial: bool = False) -> None:
+        if status in (403, 429):
+            # Як і в YouTubeUploader: на етапі чанків 403/429 — це квота
+            if not initial or "quotaExceeded" in text:
+                raise RuntimeError("YOUTUBE_QUOTA_EXCEEDED")
+        if status in (404, 410):
+            raise _SessionExpiredError(f"Upload session expired ({status})")
+        if status == 401:
+            self._creds = None
+            raise _RetryableUploadError(f"Unauthorized: {text}")
+        if status in self._RETRY_STATUSES:
+            raise _RetryableUploadError(f"HTTP {status}: {text}")
+        raise RuntimeError(f"Resumable Upload Failed: HTTP {status} | Details: {text}")
+
+    @staticmethod
+    def _parse_range(header: Optional[str]) -> int:
+        # "bytes=0-1048575" -> наступний байт 1048576
+        if not header:
+            return 0
+        return int(header.rsplit("-", 1)[1]) + 1
+
+    # --- loop & auth --------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="async-uploader", daemon=True
+                )
+                self._loop_thread.start()
+        return self._loop
+
+    async def _open(self) -> None:
+        if self._http is None:
+            connector = aiohttp.TCPConnector(limit=self._concurrency * 2)
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+            self._http = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+
+    async def _auth_headers(self) -> dict[str, str]:
+        loop = asyncio.get_running_loop()
+        creds = await loop.run_in_executor(None, self._get_credentials)
+        token = getattr(creds, "token", None)
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    def _get_credentials(self):
+        with self._creds_lock:
+            if self._creds is None:
+                if self._credentials_provider:
+                    self._creds = self._credentials_provider()
+                else:
+                    self._creds = load_credentials(self._secrets_file, self._token_file, self._SCOPES)
+            elif getattr(self._creds, "expired", False) and getattr(self._creds, "refresh_token", None):
+                self._creds.refresh(Request())
+            return self._creds
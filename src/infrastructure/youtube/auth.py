@@ -0,0 +1,37 @@
+from pathlib import Path
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+
+
+def load_credentials(secrets_file: Path, token_file: Path, scopes: list[str]) -> Credentials:
+    creds = None
+    if token_file.exists():
+        creds = Credentials.from_authorized_user_file(str(token_file), scopes)
+
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+            except Exception:
+                print("  [Auth] Token expired and refresh failed. Re-authenticating...")
+                if token_file.exists():
+                    token_file.unlink()
+                creds = None
+
+        if not creds:
+            if not secrets_file.exists():
+                raise FileNotFoundError(
+                    f"CRITICAL: '{secrets_file}' not found! Download it from Google Cloud Console."
+                )
+
+            flow = InstalledAppFlow.from_client_secrets_file(
+                str(secrets_file), scopes
+            )
+            creds = flow.run_local_server(port=0)
+
+        with open(token_file, "w") as token:
+            token.write(creds.to_json())
+
+    return creds
\ No newline at end of file
@@ -1,18 +1,62 @@
 from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
 import socket
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
+import httplib2
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import DEFAULT_HTTP_TIMEOUT_SEC, MediaFileUpload
 from googleapiclient.http import ResumableUploadError
 
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
+from src.application.bandwidth import BandwidthLimiter
 from src.domain.entities import UploadJob
-from src.domain.ports import UploaderPort
+from src.domain.ports import ProgressCallback, UploaderPort
+from src.infrastructure.youtube.auth import load_credentials
+
+
+def build_video_resource(job: UploadJob) -> dict:
+    title = job.metadata.title
+    if len(title) > 100:
+        title = title[:97] + "..."
+
+    body = {
+        "snippet": {
+            "title": title,
+            "description": job.metadata.description,
+            "tags": job.metadata.tags,
+            "categoryId": job.metadata.category_id
+        },
+        "status": {
+            "privacyStatus": job.metadata.privacy,
+            "selfDeclaredMadeForKids": False
+        }
+    }
+
+    if job.publish_at:
+        body["status"]["privacyStatus"] = "private"
+        body["status"]["publishAt"] = job.publish_at.isoformat() + "Z"
+
+    return body
+
+
+class _LocalEndpointHttp(httplib2.Http):
+    """Unauthenticated transport for a plain-HTTP API stand-in (see src/tools/fake_youtube.py)."""
+
+    def __init__(self, base_url: str):
+        super().__init__(timeout=DEFAULT_HTTP_TIMEOUT_SEC)
+        # Як і googleapiclient.http.build_http: 308 — це відповідь resumable-протоколу, а не редирект
+        self.redirect_codes = self.redirect_codes - {308}
+        self._netloc = urlsplit(base_url).netloc
+
+    def request(self, uri, *args, **kwargs):
+        # googleapiclient підміняє в URL аплоаду лише хост, залишаючи https
+        parts = urlsplit(uri)
+        if parts.scheme == "https" and parts.netloc == self._netloc:
+            uri = parts._replace(scheme="http").geturl()
+        return super().request(uri, *args, **kwargs)
 
 
 class YouTubeUploader(UploaderPort):
@@ -20,42 +64,34 @@ class YouTubeUploader(UploaderPort):
     _API_SERVICE_NAME = "youtube"
     _API_VERSION = "v3"
 
-    def __init__(self, secrets_file: Path, token_file: Path):
+    _CHUNK_SIZE = 1024 * 1024 * 5
+    # Менші чанки, щоб обмеження швидкості не перетворювалось на ривки по 5 MB
+    _THROTTLED_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, secrets_file: Path, token_file: Path, limiter: Optional[BandwidthLimiter] = None,
+                 api_base_url: Optional[str] = None):
         self._secrets_file = secrets_file
         self._token_file = token_file
+        # Без ліміту потік лише рахує досягнуту швидкість для прогресу
+        self._limiter = limiter or BandwidthLimiter()
+        self._api_base_url = api_base_url
         self._service = None
 
     def _get_authenticated_service(self):
         if self._service:
             return self._service
 
-        creds = None
-        if self._token_file.exists():
-            creds = Credentials.from_authorized_user_file(str(self._token_file), self._SCOPES)
-
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                try:
-                    creds.refresh(Request())
-                except Exception:
-                    print("  [Auth] Token expired and refresh failed. Re-authenticating...")
-                    if self._token_file.exists():
-                        self._token_file.unlink()
-                    creds = None
-
-            if not creds:
-                if not self._secrets_file.exists():
-                    raise FileNotFoundError(
-                        f"CRITICAL: '{self._secrets_file}' not found! Download it from Google Cloud Console."
-                    )
-
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    str(self._secrets_file), self._SCOPES
-                )
-                creds = flow.run_local_server(port=0)
-
-            with open(self._token_file, "w") as token:
-                token.write(creds.to_json())
+        if self._api_base_url:
+            # Локальна заглушка API: без OAuth, запити йдуть на api_base_url
+            self._service = build(
+                self._API_SERVICE_NAME, self._API_VERSION,
+                http=_LocalEndpointHttp(self._api_base_url),
+                client_options={"api_endpoint": self._api_base_url.rstrip("/") + "/"},
+                static_discovery=True
+            )
+            return self._service
+
+        creds = load_credentials(self._secrets_file, self._token_file, self._SCOPES)
 
         self._service = build(self._API_SERVICE_NAME, self._API_VERSION, credentials=creds)
         return self._service
@@ -63,41 +99,21 @@ class YouTubeUploader(UploaderPort):
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((HttpError, ResumableUploadError, socket.timeout))
+        retry=retry_if_exception_type((HttpError, ResumableUploadError, socket.timeout, ConnectionError))
     )
-    def upload(self, video_path: Path, job: UploadJob) -> str:
+    def upload(self, video_path: Path, job: UploadJob, on_progress: Optional[ProgressCallback] = None) -> str:
         service = self._get_authenticated_service()
 
-        title = job.metadata.title
-        description = job.metadata.description
-        tags = job.metadata.tags
-
-        if len(title) > 100:
-            title = title[:97] + "..."
-
-        print(f"  [YouTube] Uploading: '{title}'")
-
-        body = {
-            "snippet": {
-                "title": title,
-                "description": description,
-                "tags": tags,
-                "categoryId": job.metadata.category_id
-            },
-            "status": {
-                "privacyStatus": job.metadata.privacy,
-                "selfDeclaredMadeForKids": False
-            }
-        }
+        body = build_video_resource(job)
+        print(f"  [YouTube] Uploading: '{body['snippet']['title']}'")
 
-        try:
-            if job.publish_at:
-                body["status"]["privacyStatus"] = "private"
-                body["status"]["publishAt"] = job.publish_at.isoformat() + "Z"
+        throttled = self._limiter.enabled
+        chunk_size = self._THROTTLED_CHUNK_SIZE if throttled else self._CHUNK_SIZE
 
+        try:
             media = MediaFileUpload(
                 str(video_path),
-                chunksize=1024 * 1024 * 5,
+                chunksize=chunk_size,
                 resumable=True,
                 mimetype="video/mp4"
             )
@@ -108,11 +124,16 @@ class YouTubeUploader(UploaderPort):
                 media_body=media
             )
 
-            response = None
-            while response is None:
-                status, response = request.next_chunk()
-                if status:
-                    print(f"Uploaded {int(status.progress() * 100)}%")
+            with self._limiter.open_flow() as flow:
+                response = None
+                while response is None:
+                    flow.acquire(min(chunk_size, media.size() - request.resumable_progress))
+                    status, response = request.next_chunk()
+                    if status:
+                        if on_progress:
+                            on_progress(status.progress(), flow.stats())
+                        else:
+                            print(f"Uploaded {int(status.progress() * 100)}%")
 
             return response.get("id")
 
@@ -131,4 +152,21 @@ class YouTubeUploader(UploaderPort):
                 reason = e.content.decode()
                 if "quotaExceeded" in reason:
                     raise RuntimeError("YOUTUBE_QUOTA_EXCEEDED")
+            raise e
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception_type((HttpError, socket.timeout, ConnectionError))
+    )
+    def set_thumbnail(self, video_id: str, image_path: Path) -> None:
+        service = self._get_authenticated_service()
+        try:
+            service.thumbnails().set(
+                videoId=video_id,
+                media_body=MediaFileUpload(str(image_path), mimetype="image/jpeg")
+            ).execute()
+        except HttpError as e:
+            if e.resp.status in [403, 429] and "quotaExceeded" in e.content.decode():
+                raise RuntimeError("YOUTUBE_QUOTA_EXCEEDED")
             raise e
\ No newline at end of file
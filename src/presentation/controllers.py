@@ -3,7 +3,9 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 from src.application.dtos import CreateBatchDTO
+from src.application.planner import QueuePlan
 from src.application.presets import Preset
+from src.domain.entities import BatchProgress
 from src.infrastructure.ioc_container import Container
 
 
@@ -28,6 +30,11 @@ class BatchController:
 
         preset_rotation = form_data.get('preset_rotation')
 
+        render_targets = form_data.get('render_targets') or []
+        unknown = [t for t in render_targets if t not in self.container.render_profiles]
+        if unknown:
+            raise ValueError(f"Unknown render profile(s): {', '.join(unknown)}")
+
         dto = CreateBatchDTO(
             audio_folder=Path(folder),
             fallback_image=Path(cover),
@@ -36,11 +43,27 @@ class BatchController:
             title_template=form_data.get('title'),
             desc_template=form_data.get('desc'),
             tags_template=form_data.get('tags'),
-            preset_rotation=preset_rotation
+            preset_rotation=preset_rotation,
+            render_targets=render_targets,
+            batch_name=form_data.get('batch_name') or None,
+            channel=form_data.get('channel') or None,
+            priority=int(form_data.get('priority') or 1)
         )
 
         return self.scheduler.create_batch(dto)
 
+    def get_batch_progress(self) -> List[BatchProgress]:
+        return self.container.repo.get_batch_progress()
+
+    def get_queue_plan(self, workers: int = 1) -> QueuePlan:
+        return self.container.planner.plan(workers=workers)
+
+    def get_render_profiles(self) -> List[str]:
+        return list(self.container.render_profiles)
+
+    def get_presets_version(self) -> int:
+        return self.presets.version
+
     def get_preset_names(self) -> List[str]:
         return self.presets.get_all_names()
 
@@ -65,4 +88,10 @@ class BatchController:
         self.worker.stop()
 
     def set_logger(self, callback):
-        self.worker.log = callback
\ No newline at end of file
+        self.worker.log = callback
+
+    def subscribe_status(self, callback):
+        return self.container.subscribe(callback)
+
+    def shutdown(self):
+        self.container.close()
\ No newline at end of file
@@ -4,6 +4,8 @@ from pathlib import Path
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
 
+from src import config
+from src.application.worker import JobEvent
 from src.infrastructure.ioc_container import Container
 from src.presentation.controllers import BatchController
 
@@ -23,7 +25,22 @@ class BatchView(ctk.CTkScrollableFrame):
         self.selected_image = None
         self.pattern_list = []
 
+        self._closing = False
         self._setup_ui()
+        self.controller.subscribe_status(self._on_worker_status)
+
+    def detach(self):
+        # Вікно закривається: after() з потоку шини чекав би на mainloop, який уже не крутиться
+        self._closing = True
+
+    def _on_worker_status(self, event, job, extra):
+        # Викликається з потоку шини подій — UI оновлюємо лише через after()
+        if self._closing:
+            return
+        if event == JobEvent.WORKER_STOPPED:
+            self.after(0, lambda: self.btn_run.configure(state="normal", text="🚀 START UPLOADING"))
+        if event in (JobEvent.JOB_COMPLETED, JobEvent.JOB_FAILED, JobEvent.JOB_PRERENDERED, JobEvent.WORKER_STOPPED):
+            self.after(0, self._refresh_batches)
 
     def _setup_ui(self):
         self.grid_columnconfigure(0, weight=1)
@@ -57,6 +74,17 @@ class BatchView(ctk.CTkScrollableFrame):
         self.ent_freq.insert(0, "1")
         self.ent_freq.pack(fill="x", pady=2)
 
+        ctk.CTkLabel(self.frame_schedule, text="Batch priority (1-100):").pack(anchor="w", pady=(5, 0))
+        self.ent_priority = ctk.CTkEntry(self.frame_schedule)
+        self.ent_priority.insert(0, "1")
+        self.ent_priority.pack(fill="x", pady=2)
+
+        ctk.CTkLabel(self.frame_schedule, text="Also render (same pass):").pack(anchor="w", pady=(5, 0))
+        self.chk_short = ctk.CTkCheckBox(self.frame_schedule, text="Vertical Short (1080x1920)")
+        self.chk_short.pack(anchor="w", pady=2)
+        self.chk_thumb = ctk.CTkCheckBox(self.frame_schedule, text="Thumbnail (JPEG)")
+        self.chk_thumb.pack(anchor="w", pady=2)
+
         self.frame_meta = self._create_card("📝 Metadata Strategy")
         self.frame_meta.master.grid(row=1, column=0, columnspan=2, sticky="ew", pady=10)
 
@@ -76,6 +104,12 @@ class BatchView(ctk.CTkScrollableFrame):
                                      height=45, font=("Arial", 14, "bold"), command=self._on_start_worker)
         self.btn_run.pack(side="right", fill="x", expand=True, padx=(10, 0))
 
+        self.frame_batches = self._create_card("📦 Batches")
+        self.frame_batches.master.grid(row=3, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+        self.lbl_batches = ctk.CTkLabel(self.frame_batches, text="", justify="left", font=("Consolas", 11))
+        self.lbl_batches.pack(anchor="w")
+        self._refresh_batches()
+
     def _create_card(self, title):
         card = ctk.CTkFrame(self, fg_color=COLORS["card"], corner_radius=10)
         ctk.CTkLabel(card, text=title, font=("Segoe UI", 16, "bold"), text_color=COLORS["primary"]).pack(anchor="w",
@@ -94,6 +128,7 @@ class BatchView(ctk.CTkScrollableFrame):
         ctk.CTkButton(row, text="🗑", width=40, fg_color="#AA3333", command=self._on_delete_preset).pack(side="left")
 
         self._refresh_presets()
+        self.after(2000, self._watch_presets)
 
         self.ent_title = self._add_field(parent, "Title Template:")
         self.ent_desc = self._add_field(parent, "Description:", is_textbox=True)
@@ -129,7 +164,9 @@ class BatchView(ctk.CTkScrollableFrame):
             'title': self.ent_title.get(),
             'desc': self.ent_desc.get("0.0", "end").strip(),
             'tags': self.ent_tags.get(),
-            'preset_rotation': None
+            'preset_rotation': None,
+            'render_targets': self._selected_render_targets(),
+            'priority': self.ent_priority.get()
         }
 
         if self.mode_tab.get() == "Pattern Mode":
@@ -145,10 +182,24 @@ class BatchView(ctk.CTkScrollableFrame):
             count = self.controller.generate_batch(form_data)
             messagebox.showinfo("Success", f"Generated {count} jobs successfully!")
             self.log(f"Queue generated: {count} videos.")
+            self._refresh_batches()
         except Exception as e:
             messagebox.showerror("Error", str(e))
             traceback.print_exc()
 
+    def _selected_render_targets(self):
+        extra = []
+        if self.chk_short.get():
+            extra.append("short")
+        if self.chk_thumb.get():
+            extra.append("thumbnail")
+        return ["landscape"] + extra if extra else []
+
+    def _refresh_batches(self):
+        active = [p for p in self.controller.get_batch_progress() if p.done < p.total]
+        lines = [f"{p.batch.name[:40]:<40} x{p.batch.priority:<3} {p.done:>5}/{p.total:<5}" for p in active]
+        self.lbl_batches.configure(text="\n".join(lines) or "No active batches")
+
     def _on_start_worker(self):
         self.controller.start_worker()
         self.btn_run.configure(state="disabled", text="Running...")
@@ -180,10 +231,17 @@ class BatchView(ctk.CTkScrollableFrame):
         self._refresh_presets()
 
     def _refresh_presets(self):
+        self._presets_version = self.controller.get_presets_version()
         names = self.controller.get_preset_names()
         self.combo_presets.configure(values=names if names else ["None"])
         if names: self.combo_presets.set("Select...")
 
+    def _watch_presets(self):
+        # Пресети могли змінити в іншому процесі (CLI, другий воркер)
+        if self.controller.get_presets_version() != self._presets_version:
+            self._refresh_presets()
+        self.after(2000, self._watch_presets)
+
     def _sel_folder(self):
         p = filedialog.askdirectory()
         if p:
@@ -223,22 +281,37 @@ class MainApp(ctk.CTk):
         self.geometry("800x800")
 
         self.controller = BatchController(container)
+        self.log_sink = container.log_sink
 
         self.log_box = ctk.CTkTextbox(self, height=100)
         self.log_box.pack(side="bottom", fill="x", padx=10, pady=10)
 
-        self.controller.set_logger(self.log_message)
-
         self.view = BatchView(self, self.controller, self.log_message)
         self.view.pack(fill="both", expand=True, padx=10, pady=5)
 
+        self.after(config.LOG_DRAIN_INTERVAL_MS, self._drain_logs)
+
     def log_message(self, msg: str):
-        def _update():
-            self.log_box.insert("end", f"[{datetime.now().strftime('%H:%M:%S')}] {msg}\n")
+        self.log_sink.write(msg)
+
+    def _drain_logs(self):
+        lines, dropped = self.log_sink.drain()
+        if dropped:
+            lines.insert(0, f"... {dropped} older lines skipped (full log in data/logs/worker.log)")
+
+        if lines:
+            self.log_box.insert("end", "\n".join(lines) + "\n")
+            # Обрізаємо віджет, щоб він не ріс безмежно
+            line_count = int(self.log_box.index("end-1c").split(".")[0]) - 1
+            excess = line_count - config.LOG_WIDGET_MAX_LINES
+            if excess > 0:
+                self.log_box.delete("1.0", f"{excess + 1}.0")
             self.log_box.see("end")
 
-        self.after(0, _update)
+        self.after(config.LOG_DRAIN_INTERVAL_MS, self._drain_logs)
 
     def on_close(self):
         self.controller.stop_worker()
+        self.view.detach()
+        self.controller.shutdown()
         self.destroy()
\ No newline at end of file
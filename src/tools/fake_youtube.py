@@ -0,0 +1,334 @@
+"""
+Local stand-in for the YouTube Data API upload endpoints (no quota is burned):
+
+    python -m src.tools.fake_youtube --port 8765 --latency-ms 40 --error-rate 0.02 --drop-rate 0.01
+
+Point the app at it with YOUTUBE_API_BASE_URL = "http://127.0.0.1:8765" in src/config.py.
+Emulates the resumable ``videos.insert`` protocol and ``thumbnails.set``.
+"""
+import argparse
+import json
+import random
+import socket
+import struct
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+_UPLOAD_PATH = "/upload/youtube/v3/videos"
+_THUMBNAIL_PATH = "/upload/youtube/v3/thumbnails/set"
+_READ_SLICE = 64 * 1024
+
+
+@dataclass
+class FaultProfile:
+    latency_ms: float = 0.0  # затримка перед кожною відповіддю
+    jitter_ms: float = 0.0
+    bandwidth_kbps: Optional[int] = None  # ліміт на одне з'єднання при читанні тіла запиту
+    error_rate: float = 0.0  # частка PUT-чанків з відповіддю 503
+    drop_rate: float = 0.0  # частка PUT-чанків, де з'єднання обривається посеред тіла
+    quota_units: Optional[int] = None  # після витрати — 403 quotaExceeded
+    seed: Optional[int] = None
+
+
+@dataclass
+class _UploadSession:
+    total: int
+    metadata: dict
+    received: int = 0
+    video_id: Optional[str] = None
+
+
+class FakeYouTubeServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server emulating the resumable upload endpoints with
+    injectable faults. ``stats`` counts requests, sessions, resumes and every
+    injected fault, so a soak run can be checked against what was injected.
+    """
+
+    daemon_threads = True
+    INSERT_COST = 1600
+    THUMBNAIL_COST = 50
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, faults: Optional[FaultProfile] = None) -> None:
+        super().__init__((host, port), _Handler)
+        self.faults: FaultProfile = faults or FaultProfile()
+        self.sessions: dict[str, _UploadSession] = {}
+        self.videos: dict[str, dict] = {}
+        self.stats: Counter = Counter()
+        self.quota_used: int = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(self.faults.seed)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeYouTubeServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-youtube", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def spend_quota(self, cost: int) -> bool:
+        with self._lock:
+            limit = self.faults.quota_units
+            if limit is not None and self.quota_used + cost > limit:
+                self.stats["injected_quota"] += 1
+                return False
+            self.quota_used += cost
+            return True
+
+    def response_delay(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(-self.faults.jitter_ms, self.faults.jitter_ms)
+        return max(self.faults.latency_ms + jitter, 0.0) / 1000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive, як у справжнього API — пул з'єднань клієнта перевикористовує сокети
+    protocol_version = "HTTP/1.1"
+    server: FakeYouTubeServer
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        self.server.count("requests")
+        time.sleep(self.server.response_delay())
+
+        if url.path == _UPLOAD_PATH:
+            self._start_upload()
+        elif url.path == _THUMBNAIL_PATH:
+            self._set_thumbnail(parse_qs(url.query))
+        else:
+            self._read_body()
+            self._error(404, "notFound", f"No handler for POST {url.path}")
+
+    def do_PUT(self) -> None:
+        url = urlsplit(self.path)
+        self.server.count("requests")
+        time.sleep(self.server.response_delay())
+
+        upload_id = parse_qs(url.query).get("upload_id", [None])[0]
+        if url.path != _UPLOAD_PATH or not upload_id:
+            self._read_body()
+            self._error(404, "notFound", f"No handler for PUT {url.path}")
+            return
+        self._put_chunk(upload_id)
+
+    # --- endpoints ----------------------------------------------------------
+
+    def _start_upload(self) -> None:
+        raw = self._read_body()
+        if not self.server.spend_quota(self.server.INSERT_COST):
+            self._quota_exceeded()
+            return
+
+        try:
+            metadata = json.loads(raw or b"{}")
+            total = int(self.headers["X-Upload-Content-Length"])
+        except (TypeError, ValueError):
+            self._error(400, "badRequest", "Missing X-Upload-Content-Length or invalid JSON body")
+            return
+
+        upload_id = uuid.uuid4().hex
+        with self.server._lock:
+            self.server.sessions[upload_id] = _UploadSession(total=total, metadata=metadata)
+        self.server.count("sessions_started")
+
+        host = self.headers.get("Host") or "{}:{}".format(*self.server.server_address[:2])
+        self._reply(200, headers={
+            "Location": f"http://{host}{_UPLOAD_PATH}?uploadType=resumable&upload_id={upload_id}"
+        })
+
+    def _put_chunk(self, upload_id: str) -> None:
+        session = self.server.sessions.get(upload_id)
+        if session is None:
+            self._read_body()
+            self._error(404, "notFound", "Upload session not found")
+            return
+
+        content_range = self.headers.get("Content-Range", "")
+        length = int(self.headers.get("Content-Length") or 0)
+
+        if length and self.server.roll(self.server.faults.drop_rate):
+            self._drop_connection(length)
+            return
+
+        data = self._read_body()
+
+        if content_range.startswith("bytes */"):
+            self.server.count("resume_queries")
+            self._session_status(session)
+            return
+
+        if self.server.roll(self.server.faults.error_rate):
+            self.server.count("injected_5xx")
+            self._error(503, "backendError", "Injected backend error")
+            return
+
+        try:
+            start = int(content_range.split(" ", 1)[1].split("-", 1)[0])
+        except (IndexError, ValueError):
+            self._error(400, "badRequest", f"Invalid Content-Range: {content_range!r}")
+            return
+
+        with self.server._lock:
+            if start <= session.received:
+                overlap = session.received - start
+                self.server.stats["bytes_resent"] += min(overlap, len(data))
+                session.received = max(session.received, start + len(data))
+            self.server.stats["bytes_received"] += len(data)
+            if session.received >= session.total and session.video_id is None:
+                session.video_id = uuid.uuid4().hex[:11]
+                self.server.videos[session.video_id] = {**session.metadata, "size": session.total}
+                self.server.stats["videos_completed"] += 1
+
+        self._session_status(session)
+
+    def _set_thumbnail(self, query: dict) -> None:
+        self._read_body()
+        if not self.server.spend_quota(self.server.THUMBNAIL_COST):
+            self._quota_exceeded()
+            return
+
+        video_id = query.get("videoId", [None])[0]
+        if video_id not in self.server.videos:
+            self._error(404, "videoNotFound", f"Video {video_id} not found")
+            return
+
+        self.server.count("thumbnails_set")
+        self._json(200, {"kind": "youtube#thumbnailSetResponse",
+                         "items": [{"default": {"url": f"{self.server.url}/vi/{video_id}/default.jpg"}}]})
+
+    # --- helpers ------------------------------------------------------------
+
+    def _session_status(self, session: _UploadSession) -> None:
+        if session.video_id:
+            self._json(200, {"kind": "youtube#video", "id": session.video_id, **session.metadata})
+            return
+        headers = {"Range": f"bytes=0-{session.received - 1}"} if session.received else {}
+        self._reply(308, headers=headers)
+
+    def _read_body(self, limit: Optional[int] = None) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        if limit is not None:
+            length = min(length, limit)
+
+        rate = self.server.faults.bandwidth_kbps
+        bytes_per_sec = rate * 1000 / 8 if rate else None
+        started = time.monotonic()
+
+        chunks = []
+        remaining = length
+        while remaining > 0:
+            piece = self.rfile.read(min(_READ_SLICE, remaining))
+            if not piece:
+                break
+            chunks.append(piece)
+            remaining -= len(piece)
+            if bytes_per_sec:
+                # Пропускна здатність з'єднання: не читаємо швидше за ліміт
+                ahead = (length - remaining) / bytes_per_sec - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        return b"".join(chunks)
+
+    def _drop_connection(self, length: int) -> None:
+        self._read_body(limit=length // 2)
+        self.server.count("injected_drops")
+        self.close_connection = True
+        # SO_LINGER 0: close() шле RST, як при обриві мережі, а не штатний FIN
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.connection.close()
+
+    def _quota_exceeded(self) -> None:
+        self._error(403, "quotaExceeded",
+                    "The request cannot be completed because you have exceeded your quota.",
+                    domain="youtube.quota")
+
+    def _error(self, status: int, reason: str, message: str, domain: str = "youtube.api") -> None:
+        self._json(status, {"error": {
+            "code": status,
+            "message": message,
+            "errors": [{"message": message, "domain": domain, "reason": reason}]
+        }})
+
+    def _json(self, status: int, payload: dict) -> None:
+        self._reply(status, json.dumps(payload).encode("utf-8"), {"Content-Type": "application/json; charset=UTF-8"})
+
+    def _reply(self, status: int, body: bytes = b"", headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the delay")
+    parser.add_argument("--bandwidth-kbps", type=int, help="Per-connection upload cap")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of chunk PUTs answered 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Share of chunk PUTs cut mid-body")
+    parser.add_argument("--quota-units", type=int, help="Daily quota; 403 quotaExceeded once spent")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible fault injection")
+
+
+def faults_from_args(args: argparse.Namespace) -> FaultProfile:
+    return FaultProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        bandwidth_kbps=args.bandwidth_kbps,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        quota_units=args.quota_units,
+        seed=args.seed
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="fake_youtube", description="Local YouTube upload API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = FakeYouTubeServer(args.host, args.port, faults_from_args(args))
+    print(f"Fake YouTube API listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(dict(server.stats), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,237 @@
+"""
+Queue persistence micro-benchmark: claim -> heartbeat -> complete cycles
+through SqliteRepository. Profiles:
+
+    orm      the previous code path (ORM session per call, update via query.get), SQLite defaults
+    default  current Core claim/heartbeat/update path, SQLite defaults
+    tuned    current Core path with config.SQLITE_PRAGMAS
+
+    python -m src.tools.repo_bench --jobs 5000 --workers 4 --readers 1
+
+A state transition is a claim (PENDING -> PROCESSING) or a completion
+(PROCESSING -> COMPLETED); heartbeats are counted as extra writes only.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from src import config
+from sqlalchemy import func
+from sqlalchemy.exc import LegacyAPIWarning
+
+from src.domain.entities import Batch, JobStatus, MediaInfo, UploadJob, VideoMetadata
+from src.infrastructure.db.models import BatchModel, JobModel
+from src.infrastructure.db.repository import SqliteRepository
+
+
+class _OrmRepository(SqliteRepository):
+    """The hot paths as they were before the Core rewrite, kept as the benchmark baseline."""
+
+    def claim_next(self, worker_id: str, lease_seconds: int, publish_before: Optional[datetime] = None):
+        session = self.Session()
+        try:
+            while True:
+                candidate_id, batch_id = self._orm_next_candidate(session)
+                if candidate_id is None:
+                    return None
+
+                claimed = session.query(JobModel) \
+                    .filter(JobModel.id == candidate_id, JobModel.status == JobStatus.PENDING) \
+                    .update({
+                        JobModel.status: JobStatus.PROCESSING,
+                        JobModel.worker_id: worker_id,
+                        JobModel.lease_expires_at: datetime.now() + timedelta(seconds=lease_seconds),
+                    }, synchronize_session=False)
+                if claimed and batch_id is not None:
+                    session.query(BatchModel) \
+                        .filter(BatchModel.id == batch_id) \
+                        .update({BatchModel.vtime: BatchModel.vtime + 1.0 / func.max(BatchModel.priority, 1)},
+                                synchronize_session=False)
+                session.commit()
+
+                if claimed:
+                    return self._to_entity(session.get(JobModel, candidate_id))
+        finally:
+            session.close()
+
+    def _orm_next_candidate(self, session):
+        pending = session.query(JobModel.id, JobModel.batch_id) \
+            .filter(JobModel.status == JobStatus.PENDING)
+        if self.fair_scheduling:
+            active = session.query(JobModel.batch_id) \
+                .filter(JobModel.status == JobStatus.PENDING, JobModel.batch_id.isnot(None)) \
+                .distinct() \
+                .scalar_subquery()
+            batch_id = session.query(BatchModel.id) \
+                .filter(BatchModel.id.in_(active)) \
+                .order_by(BatchModel.vtime, BatchModel.priority.desc(), BatchModel.id) \
+                .limit(1) \
+                .scalar()
+            if batch_id is not None:
+                pending = pending.filter(JobModel.batch_id == batch_id)
+
+        row = pending.order_by(JobModel.priority.desc(), JobModel.publish_at).first()
+        return (row.id, row.batch_id) if row else (None, None)
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+        session = self.Session()
+        renewed = session.query(JobModel) \
+            .filter(JobModel.id == job_id,
+                    JobModel.worker_id == worker_id,
+                    JobModel.status == JobStatus.PROCESSING) \
+            .update({JobModel.lease_expires_at: datetime.now() + timedelta(seconds=lease_seconds)},
+                    synchronize_session=False)
+        session.commit()
+        session.close()
+        return renewed == 1
+
+    def update(self, job: UploadJob, owner: Optional[str] = None) -> bool:
+        session = self.Session()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", LegacyAPIWarning)
+            model = session.query(JobModel).get(job.id)
+        if model:
+            model.status = job.status
+            model.remote_video_id = job.remote_video_id
+            model.error_message = job.error_message
+            model.render_seconds = job.render_seconds
+            model.upload_seconds = job.upload_seconds
+            model.upload_bytes = job.upload_bytes
+            model.completed_at = job.completed_at
+            if job.status != JobStatus.PROCESSING:
+                model.worker_id = None
+                model.lease_expires_at = None
+            session.commit()
+        session.close()
+        return model is not None
+
+
+_PROFILES = {
+    "orm": (_OrmRepository, None),
+    "default": (SqliteRepository, None),
+    "tuned": (SqliteRepository, config.SQLITE_PRAGMAS),
+}
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(pct / 100 * len(ordered)), len(ordered) - 1)]
+
+
+def _seed(repo: SqliteRepository, jobs: int, batches: int) -> None:
+    batch_ids = [repo.add_batch(Batch(name=f"bench {i}", priority=i + 1)) for i in range(batches)]
+    start = datetime.now() + timedelta(days=1)
+    for i in range(jobs):
+        repo.add(UploadJob(
+            audio_path=Path(f"track_{i:05d}.mp3"),
+            image_path=Path("cover.jpg"),
+            metadata=VideoMetadata(title=f"Bench {i:05d}", description="bench", tags=["bench"]),
+            publish_at=start + timedelta(minutes=i),
+            media=MediaInfo(duration_sec=60.0),
+            batch_id=batch_ids[i % batches]
+        ))
+
+
+def _worker(repo: SqliteRepository, worker_id: str, latencies: list[float], errors: list[str]) -> None:
+    try:
+        while True:
+            began = time.perf_counter()
+            job = repo.claim_next(worker_id, lease_seconds=300)
+            if job is None:
+                return
+            repo.heartbeat(job.id, worker_id, lease_seconds=300)
+            job.mark_completed(f"vid{job.id}")
+            job.upload_seconds, job.upload_bytes = 0.1, 1024
+            repo.update(job, owner=worker_id)
+            latencies.append(time.perf_counter() - began)
+    except Exception as e:
+        errors.append(f"{worker_id}: {e}")
+
+
+def _reader(repo: SqliteRepository, stop: threading.Event, counter: list[int]) -> None:
+    # Як GUI / `status`: періодичні агрегати, поки воркери пишуть
+    while not stop.is_set():
+        repo.get_status_counts()
+        repo.get_batch_progress()
+        counter[0] += 1
+        time.sleep(0.01)
+
+
+def run_profile(name: str, args: argparse.Namespace) -> dict:
+    repo_class, pragmas = _PROFILES[name]
+    work_dir = Path(tempfile.mkdtemp(prefix=f"yt_bench_{name}_"))
+    try:
+        repo = repo_class(f"sqlite:///{work_dir / 'bench.db'}", pragmas=pragmas)
+        _seed(repo, args.jobs, args.batches)
+
+        latencies: list[float] = []
+        errors: list[str] = []
+        reads = [0]
+        stop = threading.Event()
+        readers = [threading.Thread(target=_reader, args=(repo, stop, reads), daemon=True)
+                   for _ in range(args.readers)]
+        workers = [threading.Thread(target=_worker, args=(repo, f"bench-{i}", latencies, errors), daemon=True)
+                   for i in range(args.workers)]
+
+        began = time.perf_counter()
+        for t in readers + workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - began
+        stop.set()
+        for t in readers:
+            t.join()
+
+        completed = repo.get_status_counts().get(JobStatus.COMPLETED, 0)
+        return {
+            "profile": name,
+            "completed": completed,
+            "elapsed": elapsed,
+            "transitions_per_sec": 2 * completed / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(latencies, 50) * 1000,
+            "p99_ms": _percentile(latencies, 99) * 1000,
+            "reads": reads[0],
+            "errors": errors,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="repo_bench", description="SQLite queue state-transition benchmark")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batches", type=int, default=3)
+    parser.add_argument("--readers", type=int, default=1, help="Threads polling status like the GUI does")
+    parser.add_argument("--profile", choices=[*_PROFILES, "all"], default="all")
+    args = parser.parse_args(argv)
+
+    names = list(_PROFILES) if args.profile == "all" else [args.profile]
+    results = [run_profile(name, args) for name in names]
+
+    print(f"{args.jobs} jobs, {args.workers} workers, {args.batches} batches, {args.readers} readers")
+    for r in results:
+        print(f"{r['profile']:<8} {r['transitions_per_sec']:>9.0f} transitions/s  "
+              f"cycle p50 {r['p50_ms']:.2f} ms  p99 {r['p99_ms']:.2f} ms  "
+              f"{r['completed']}/{args.jobs} done in {r['elapsed']:.1f}s, {r['reads']} status reads")
+        for error in r["errors"][:5]:
+            print(f"  error: {error}")
+    baseline = results[0]["transitions_per_sec"]
+    if len(results) > 1 and baseline:
+        for r in results[1:]:
+            print(f"{r['profile']:<8} x{r['transitions_per_sec'] / baseline:.2f} vs {results[0]['profile']}")
+    return 0 if all(not r["errors"] and r["completed"] == args.jobs for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
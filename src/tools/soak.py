@@ -0,0 +1,210 @@
+"""
+Upload-path soak test against the local API stand-in (no quota is burned):
+
+    python -m src.tools.soak --jobs 2000 --workers 4 --backend async --error-rate 0.02 --drop-rate 0.01
+
+Jobs run through the real SqliteRepository, QueueWorker and uploader stack.
+Only rendering is replaced: each job writes --size-kb bytes instead of
+calling FFmpeg.
+"""
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from src.application.worker import JobEvent, QueueWorker
+from src.domain.entities import Batch, MediaInfo, RenderTarget, UploadJob, VideoMetadata
+from src.domain.ports import RendererPort, UploaderPort
+from src.infrastructure.db.repository import SqliteRepository
+from src.infrastructure.youtube.uploader import YouTubeUploader
+from src.tools.fake_youtube import FakeYouTubeServer, add_fault_arguments, faults_from_args
+
+
+class _SyntheticRenderer(RendererPort):
+    """Writes a fixed-size file instead of running FFmpeg."""
+
+    def __init__(self, size_bytes: int) -> None:
+        self._size = size_bytes
+        self._block = os.urandom(min(size_bytes, 1024 * 1024)) or b"\0"
+
+    def render(self, audio: Path, image: Path, output: Path, duration_sec: Optional[float] = None) -> Path:
+        with open(output, "wb") as f:
+            remaining = self._size
+            while remaining > 0:
+                f.write(self._block[:remaining])
+                remaining -= len(self._block)
+        return output
+
+    def render_multi(self, audio: Path, image: Path, outputs: list[tuple[RenderTarget, Path]]) -> list[Path]:
+        return [self.render(audio, image, path) for _, path in outputs]
+
+    def estimate_output_size(self, duration_sec: float) -> int:
+        return self._size
+
+
+class _Recorder:
+    """Status callback collecting per-job upload latency and outcomes."""
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.errors: Counter = Counter()
+        self.completed: int = 0
+        self.failed: int = 0
+        self.quota_exceeded: bool = False
+        self._started: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: JobEvent, job: Optional[UploadJob] = None, extra: Optional[dict[str, Any]] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if event == JobEvent.JOB_UPLOADING:
+                self._started[job.id] = now
+            elif event == JobEvent.JOB_COMPLETED:
+                self.completed += 1
+                started = self._started.pop(job.id, None)
+                if started is not None:
+                    self.latencies.append(now - started)
+            elif event == JobEvent.JOB_FAILED:
+                self.failed += 1
+                self.errors[str((extra or {}).get("error", "?"))[:120]] += 1
+            elif event == JobEvent.QUOTA_EXCEEDED:
+                self.quota_exceeded = True
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _create_uploaders(args: argparse.Namespace, server: FakeYouTubeServer, work_dir: Path) -> list[UploaderPort]:
+    secrets, token = work_dir / "client_secrets.json", work_dir / "token.json"
+    if args.backend == "async":
+        from google.auth.credentials import AnonymousCredentials
+        from src.infrastructure.youtube.async_uploader import AsyncYouTubeUploader
+        shared = AsyncYouTubeUploader(secrets, token, concurrency=args.workers,
+                                      api_base_url=server.url, credentials_provider=AnonymousCredentials)
+        return [shared] * args.workers
+    return [YouTubeUploader(secrets, token, api_base_url=server.url) for _ in range(args.workers)]
+
+
+def run(args: argparse.Namespace) -> int:
+    work_dir = Path(tempfile.mkdtemp(prefix="yt_soak_"))
+    server = FakeYouTubeServer(port=args.port, faults=faults_from_args(args)).start()
+    recorder = _Recorder()
+    log_lines: list[str] = []
+
+    try:
+        repo = SqliteRepository(f"sqlite:///{work_dir / 'soak.db'}")
+        batch_id = repo.add_batch(Batch(name="soak"))
+        start = datetime.now() + timedelta(days=1)
+        for i in range(args.jobs):
+            repo.add(UploadJob(
+                audio_path=work_dir / f"track_{i:05d}.mp3",
+                image_path=work_dir / "cover.jpg",
+                metadata=VideoMetadata(title=f"Soak {i:05d}", description="soak test", tags=["soak"]),
+                publish_at=start + timedelta(hours=i),
+                media=MediaInfo(duration_sec=60.0),
+                batch_id=batch_id
+            ))
+
+        renderer = _SyntheticRenderer(args.size_kb * 1024)
+        workers = [
+            QueueWorker(
+                repo=repo,
+                renderer=renderer,
+                uploader=uploader,
+                temp_dir=work_dir,
+                logger_callback=log_lines.append if args.verbose else (lambda msg: None),
+                status_callback=recorder,
+                worker_id=f"soak-{i}"
+            )
+            for i, uploader in enumerate(_create_uploaders(args, server, work_dir))
+        ]
+
+        print(f"Soak: {args.jobs} jobs x {args.size_kb} KB, {args.workers} {args.backend} workers -> {server.url}",
+              file=sys.stderr)
+        began = time.monotonic()
+        deadline = began + args.timeout if args.timeout else None
+
+        # Аплоадери друкують у stdout на кожен файл — на тисячах задач це лише шум
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            for w in workers:
+                w.start_background()
+            next_report = began + 5
+            while any(w.is_alive() for w in workers):
+                if recorder.completed + recorder.failed >= args.jobs or (deadline and time.monotonic() > deadline):
+                    break
+                time.sleep(0.2)
+                if time.monotonic() >= next_report:
+                    print(f"  {recorder.completed} done, {recorder.failed} failed, "
+                          f"{time.monotonic() - began:.0f}s", file=sys.stderr)
+                    next_report += 5
+            elapsed = time.monotonic() - began
+            for w in workers:
+                w.stop()
+            for w in workers:
+                w.join(timeout=30)
+
+        for uploader in {id(w.uploader): w.uploader for w in workers}.values():
+            if hasattr(uploader, "shutdown"):
+                uploader.shutdown()
+
+        _report(args, recorder, server, elapsed)
+        if args.verbose:
+            print("\n".join(log_lines[-50:]))
+        return 0 if recorder.failed == 0 and recorder.completed == args.jobs else 1
+    finally:
+        server.stop()
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _report(args: argparse.Namespace, recorder: _Recorder, server: FakeYouTubeServer, elapsed: float) -> None:
+    stats = server.stats
+    uploaded_mb = recorder.completed * args.size_kb / 1024
+    # Клієнт повторює або продовженням сесії (запит */total), або новою сесією
+    restarts = stats["sessions_started"] - stats["videos_completed"]
+
+    print(f"\nCompleted   {recorder.completed}/{args.jobs} in {elapsed:.1f}s "
+          f"({recorder.completed / elapsed:.2f} jobs/s, {uploaded_mb / elapsed:.2f} MB/s)")
+    print(f"Failed      {recorder.failed}" + ("  (stopped: quota exceeded)" if recorder.quota_exceeded else ""))
+    if recorder.latencies:
+        print("Latency     p50 {:.2f}s  p95 {:.2f}s  p99 {:.2f}s  max {:.2f}s".format(
+            _percentile(recorder.latencies, 50), _percentile(recorder.latencies, 95),
+            _percentile(recorder.latencies, 99), max(recorder.latencies)))
+    print(f"Retries     {stats['resume_queries']} resumed, {restarts} restarted sessions, "
+          f"{stats['bytes_resent'] / 1024 / 1024:.1f} MB re-sent")
+    print(f"Injected    {stats['injected_5xx']} x 5xx, {stats['injected_drops']} drops, "
+          f"{stats['injected_quota']} quota errors")
+    print(f"Server      {stats['requests']} requests, {stats['bytes_received'] / 1024 / 1024:.1f} MB received")
+    for error, count in recorder.errors.most_common(5):
+        print(f"  {count:>5} x {error}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="soak", description="Upload soak test against a local YouTube stand-in")
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--size-kb", type=int, default=512, help="Size of each synthetic video")
+    parser.add_argument("--backend", choices=["sync", "async"], default="async")
+    parser.add_argument("--port", type=int, default=0, help="Stand-in port (0 = any free port)")
+    parser.add_argument("--timeout", type=float, help="Stop after this many seconds")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary queue DB and files")
+    parser.add_argument("--verbose", action="store_true")
+    add_fault_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())